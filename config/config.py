@@ -0,0 +1,63 @@
+import os
+
+# How often the reconciler compares the database with the channels that
+# actually exist in each guild. Campaigns aren't stored per guild, so it only
+# runs in a process that runs every shard.
+RECONCILE_INTERVAL_MINUTES = float(os.getenv('RECONCILE_INTERVAL_MINUTES', '30'))
+
+# Prefix commands (!add_plot_point ...) need the privileged message content
+# intent. Every command is also available as a slash command, so this can be
+# turned off once the server has moved over.
+ENABLE_PREFIX_COMMANDS = os.getenv('ENABLE_PREFIX_COMMANDS', 'true').lower() in ('1', 'true', 'yes')
+
+# Minutes before a session starts at which reminders go out
+REMINDER_OFFSETS_MINUTES = [int(m) for m in os.getenv('REMINDER_OFFSETS_MINUTES', '1440,60').split(',') if m.strip()]
+
+# How far ahead the reminder scheduler loads pending reminders into memory
+REMINDER_HORIZON_MINUTES = float(os.getenv('REMINDER_HORIZON_MINUTES', '60'))
+
+# Times a reminder is tried before it is marked Failed; retries back off from
+# one minute and never go out after the session has started
+REMINDER_MAX_ATTEMPTS = int(os.getenv('REMINDER_MAX_ATTEMPTS', '5'))
+
+# Storage backend: 'sqlite' for a single bot process, 'postgres' when several
+# processes (shards) share one database
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'sqlite').lower()
+
+# SQLite database file, relative to the working directory the bot starts in
+DATABASE_PATH = os.getenv('DATABASE_PATH', 'campaigns_plotpoints.db')
+
+# Directory the owner-only !backup command writes database snapshots to
+BACKUP_DIR = os.getenv('BACKUP_DIR', 'backups')
+
+# PostgreSQL connection settings, only used when STORAGE_BACKEND=postgres
+DATABASE_URL = os.getenv('DATABASE_URL')
+DATABASE_POOL_MIN_SIZE = int(os.getenv('DATABASE_POOL_MIN_SIZE', '1'))
+DATABASE_POOL_MAX_SIZE = int(os.getenv('DATABASE_POOL_MAX_SIZE', '10'))
+
+# Event bus used to keep several bot processes in sync: 'local' for a single
+# process, 'sqlite' for processes on the same host sharing EVENT_BUS_PATH
+EVENT_BUS_BACKEND = os.getenv('EVENT_BUS_BACKEND', 'local').lower()
+EVENT_BUS_PATH = os.getenv('EVENT_BUS_PATH', 'venturevault_events.db')
+EVENT_BUS_POLL_SECONDS = float(os.getenv('EVENT_BUS_POLL_SECONDS', '0.5'))
+
+# Command rate limits as "<commands>/<seconds>" token buckets
+RATE_LIMIT_PER_USER = os.getenv('RATE_LIMIT_PER_USER', '5/10')
+RATE_LIMIT_PER_GUILD = os.getenv('RATE_LIMIT_PER_GUILD', '30/10')
+RATE_LIMIT_PER_COMMAND = os.getenv('RATE_LIMIT_PER_COMMAND', '10/10')  # per command within a guild
+
+# Identical read commands within this many seconds share one query and response
+COALESCE_WINDOW_SECONDS = float(os.getenv('COALESCE_WINDOW_SECONDS', '3'))
+
+# Number of rendered embeds kept in memory
+EMBED_CACHE_SIZE = int(os.getenv('EMBED_CACHE_SIZE', '1024'))
+
+# Seconds to let running commands and button clicks finish on shutdown or
+# reload; keep it below the deploy's kill timeout (10s for `docker stop`)
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '8'))
+
+# Event loop monitoring: how often lag is sampled, and how long a callback may
+# block the loop before its stack is captured and logged
+LOOP_LAG_SAMPLE_SECONDS = float(os.getenv('LOOP_LAG_SAMPLE_SECONDS', '0.1'))
+SLOW_CALLBACK_MS = float(os.getenv('SLOW_CALLBACK_MS', '250'))
+LOOP_LAG_LOG_MINUTES = float(os.getenv('LOOP_LAG_LOG_MINUTES', '5'))
@@ -1,18 +1,69 @@
+import asyncio
 import discord
+from discord import app_commands
 from discord.ext import commands
 import os
 import logging
+import signal
+
+from config.config import ENABLE_PREFIX_COMMANDS
+from lfg_bot.errors.custom_errors import RateLimited, ShuttingDown
+from lfg_bot.utils.diagnostics import get_loop_monitor
+from lfg_bot.utils.helpers import sync_guild_commands
+from lfg_bot.utils.lifecycle import get_lifecycle
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
 
 # Intents setup
 intents = discord.Intents.default()
-intents.message_content = True
+intents.message_content = ENABLE_PREFIX_COMMANDS
 intents.members = True
 
+class VentureVaultTree(app_commands.CommandTree):
+    async def _call(self, interaction):
+        # Slash commands count as running work for the extension that owns them
+        command = interaction.command
+        name = command.qualified_name if command else interaction.data.get('name')
+        async with get_lifecycle().track(getattr(command, 'module', None)):
+            with get_loop_monitor().running(f"/{name} by {interaction.user}"):
+                await super()._call(interaction)
+
+
 class VentureVaultBot(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, tree_cls=VentureVaultTree, **kwargs)
+        self._synced_guilds = set()
+        self.lifecycle = get_lifecycle()
+        self.monitor = get_loop_monitor()
+        self._shutdown_task = None
+
+    async def invoke(self, ctx):
+        command = ctx.command
+        async with self.lifecycle.track(command.module if command else None):
+            # The command may have been replaced by a reload while this one waited
+            if command is not None:
+                ctx.command = self.get_command(command.qualified_name) or command
+            with self.monitor.running(f"!{ctx.invoked_with} by {ctx.author}"):
+                await super().invoke(ctx)
+
+    async def close(self):
+        # Let running commands and button clicks finish before disconnecting
+        await self.lifecycle.shutdown(self)
+        await super().close()
+
+    def _on_sigterm(self):
+        log.info("Received SIGTERM, shutting down")
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self.close())
+
     async def setup_hook(self):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except NotImplementedError:
+            pass  # No signal handlers on Windows event loops
+
         # Load all cogs in the cogs directory
         for filename in os.listdir('./lfg_bot/cogs'):
             if filename.endswith('.py') and not filename.startswith('__'):
@@ -23,6 +74,18 @@ class VentureVaultBot(commands.Bot):
                         print(f'Loaded {filename}')
                 except Exception as e:
                     print(f'Failed to load {filename}: {e}')
+
+    async def on_ready(self):
+        # on_ready fires again after reconnects, only sync guilds we haven't seen
+        for guild in self.guilds:
+            if guild.id not in self._synced_guilds:
+                await sync_guild_commands(self, guild)
+                self._synced_guilds.add(guild.id)
+
+    async def on_guild_join(self, guild):
+        await sync_guild_commands(self, guild)
+        self._synced_guilds.add(guild.id)
+
 # Create bot instance
 bot = VentureVaultBot(command_prefix='!', intents=intents)
 
@@ -31,9 +94,13 @@ bot = VentureVaultBot(command_prefix='!', intents=intents)
 async def on_command_error(ctx, error):
     if isinstance(error, commands.CommandNotFound):
         await ctx.send(f"Command not found. Try !help to see available commands.")
+    elif isinstance(getattr(error, 'original', error), (RateLimited, ShuttingDown)):
+        pass  # answered by RateLimitCog and LifecycleCog
     else:
-        # Log other types of errors
-        print(f"An error occurred: {error}")
+        # Log other types of errors with the command that raised them
+        log.error("Command !%s by %s failed: %s", ctx.invoked_with, ctx.author, error,
+                  exc_info=getattr(error, 'original', error),
+                  extra={'event': 'command_error', 'command': ctx.invoked_with, 'user_id': ctx.author.id})
 
 # Optional: Add a ping command to test bot connectivity
 @bot.command()
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from config.config import BACKUP_DIR, STORAGE_BACKEND
+from lfg_bot.database import db
+from lfg_bot.database.storage import get_storage
+from lfg_bot.export import backup_database, export_campaigns
+from lfg_bot.utils.autocomplete import campaign_index
+
+log = logging.getLogger(__name__)
+
+
+class BackupCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+
+    async def campaign_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=label, value=campaign_id)
+                for label, campaign_id in campaign_index.campaign_choices(current, interaction.user.id)]
+
+    @commands.hybrid_command(name='export_campaign')
+    @app_commands.describe(campaign_id="Campaign to export")
+    async def export_campaign(self, ctx, campaign_id: int):
+        """Export a campaign and its plot points as a gzipped JSONL file
+
+        Usage: !export_campaign <campaign_id>
+        Example: !export_campaign 1
+        """
+        try:
+            campaign = await self.storage.get_campaign(campaign_id)
+            if not campaign:
+                await ctx.send(f"❌ Campaign with ID {campaign_id} not found.")
+                return
+
+            if campaign.dm_id and campaign.dm_id != str(ctx.author.id):
+                await ctx.send("❌ You don't have permission to export this campaign.")
+                return
+
+            await ctx.defer()
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, f"campaign-{campaign_id}.jsonl.gz")
+                result = await export_campaigns(self.storage, path, 'jsonl', campaign_id)
+                await ctx.send(
+                    f"✅ Exported '{campaign.name}': {result.counts['plot_point']} plot points",
+                    file=discord.File(path)
+                )
+
+        except Exception as e:
+            await ctx.send(f"❌ Error exporting campaign: {str(e)}")
+            log.exception("Export Campaign Error: %s", e)
+
+    @commands.command(name='backup')
+    @commands.is_owner()
+    async def backup(self, ctx):
+        """Take an online snapshot of the campaign database
+
+        Usage: !backup
+        """
+        if STORAGE_BACKEND != 'sqlite':
+            await ctx.send("❌ !backup only works with the SQLite backend. Back up PostgreSQL with pg_dump.")
+            return
+
+        try:
+            destination = os.path.join(BACKUP_DIR, f"campaigns_plotpoints-{datetime.now():%Y%m%d-%H%M%S}.db")
+            await asyncio.to_thread(backup_database, db.database, destination)
+            await ctx.send(f"✅ Backed up database to `{destination}`")
+
+        except Exception as e:
+            await ctx.send(f"❌ Error backing up database: {str(e)}")
+            log.exception("Backup Error: %s", e)
+
+    export_campaign.autocomplete('campaign_id')(campaign_autocomplete)
+
+
+async def setup(bot):
+    await bot.add_cog(BackupCog(bot))
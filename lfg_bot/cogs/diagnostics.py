@@ -0,0 +1,84 @@
+import asyncio
+import logging
+
+from discord.ext import commands
+
+from lfg_bot.utils.diagnostics import get_loop_monitor
+from lfg_bot.utils.embeds import embed_cache
+from lfg_bot.utils.lifecycle import get_lifecycle
+
+log = logging.getLogger(__name__)
+
+# Slow callbacks listed by !diag
+RECENT_SLOW_CALLBACKS = 5
+
+
+class DiagnosticsCog(commands.Cog):
+    """Runs the event loop monitor and reports on it"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.monitor = get_loop_monitor()
+
+    async def cog_load(self):
+        self.monitor.start()
+
+    async def cog_unload(self):
+        self.monitor.stop()
+
+    def summary(self):
+        stats = self.monitor.stats()
+        lines = [
+            "🩺 **Event loop**",
+            f"Lag over the last {stats['window_seconds']:.0f}s: p50 {stats['p50_ms']:.1f} ms, "
+            f"p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.0f} ms",
+            f"Slow callbacks (over {self.monitor.threshold * 1000:.0f} ms): {stats['blocked']} since "
+            f"{self.monitor.started_at:%Y-%m-%d %H:%M}, {len(self.monitor.slow_callbacks)} with stacks",
+            f"Running: {get_lifecycle().in_flight()} other commands/interactions, "
+            f"{len(asyncio.all_tasks())} tasks",
+        ]
+        lookups = embed_cache.hits + embed_cache.misses
+        if lookups:
+            lines.append(f"Embed cache: {embed_cache.hits / lookups:.0%} hits ({embed_cache.hits}/{lookups})")
+
+        recent = list(self.monitor.slow_callbacks)[-RECENT_SLOW_CALLBACKS:]
+        if recent:
+            lines.append("")
+            lines.append("**Recent slow callbacks** (`!diag <number>` for the stack)")
+            first = len(self.monitor.slow_callbacks) - len(recent) + 1
+            for number, slow in enumerate(recent, start=first):
+                lines.append(f"`#{number}` {slow.detected_at:%H:%M:%S} — {slow.lag * 1000:.0f} ms — "
+                             f"{slow.context} at `{slow.location}`")
+        return '\n'.join(lines)
+
+    @commands.command(name='diag')
+    @commands.is_owner()
+    async def diag_command(self, ctx, number: int = None):
+        """Show event loop lag and recent slow callbacks
+
+        Usage: !diag [number]
+        Example: !diag 3
+        """
+        try:
+            if number is None:
+                await ctx.send(self.summary())
+                return
+
+            slow_callbacks = list(self.monitor.slow_callbacks)
+            if not 1 <= number <= len(slow_callbacks):
+                await ctx.send(f"❌ No slow callback #{number}.")
+                return
+
+            slow = slow_callbacks[number - 1]
+            header = f"`#{number}` {slow.lag * 1000:.0f} ms — {slow.context} (task {slow.task})\n"
+            stack = ''.join(slow.stack) or "No stack captured"
+            # Keep the innermost frames if it doesn't fit in one message
+            await ctx.send(header + f"```py\n{stack[-(1900 - len(header)):]}\n```")
+
+        except Exception as e:
+            await ctx.send(f"❌ Error reading diagnostics: {str(e)}")
+            log.exception("Diag Error: %s", e)
+
+
+async def setup(bot):
+    await bot.add_cog(DiagnosticsCog(bot))
@@ -1,44 +1,75 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
-from peewee import *
 from datetime import datetime
 import re
 
-# Database setup remains the same as in the original code
-db = SqliteDatabase('campaigns_plotpoints.db')
-
-
-class BaseModel(Model):
-    class Meta:
-        database = db
-
-
-class Campaign(BaseModel):
-    name = CharField()
-    plot_category_id = CharField(null=True)
-
-
-class PlotPoint(BaseModel):
-    campaign = ForeignKeyField(Campaign, backref='plot_points')
-    number = CharField()  # Allows for 01, 02, 03a, 03b, etc.
-    title = CharField()
-    description = TextField()
-    status = CharField(default='Inactive')  # Possible values: Inactive, Active, Finished
-    channel_id = CharField(null=True)
-
+from lfg_bot.database.storage import get_storage
+from lfg_bot.utils.diagnostics import get_loop_monitor
+from lfg_bot.utils.embeds import message_shows, plot_point_embed, plot_point_payload
+from lfg_bot.utils.events import get_event_bus
+from lfg_bot.utils.lifecycle import get_lifecycle
 
 class PlotPointManagementView(discord.ui.View):
     def __init__(self, plot_point, bot):
         super().__init__()
         self.plot_point = plot_point
         self.bot = bot
+        self.storage = get_storage()
+        self.events = get_event_bus()
+
+    async def _transition(self, interaction, action, status):
+        """Run a change to status while holding this plot point's lease
+
+        Only one task in one bot process may create or delete the plot
+        point's channel and edit its overview message at a time. A click on
+        a stale button for a change that already happened, e.g. the second of
+        two quick clicks, does nothing but refresh the message. The click
+        counts as running work, so shutdowns and reloads wait for it.
+        """
+        lifecycle = get_lifecycle()
+        if not lifecycle.accepting:
+            await interaction.response.send_message(
+                "🔄 The bot is restarting. Try again in a few seconds.", ephemeral=True)
+            return
+
+        label = f"{action.__name__.strip('_')} button on plot point {self.plot_point.id} by {interaction.user}"
+        async with lifecycle.track(__name__):
+            with get_loop_monitor().running(label):
+                async with self.events.lease(f"plot_point:{self.plot_point.id}") as acquired:
+                    if not acquired:
+                        await interaction.response.send_message(
+                            "This plot point is being updated, try again in a moment.", ephemeral=True)
+                        return
+
+                    # Another process may have changed it since this view was created
+                    self.plot_point = await self.storage.get_plot_point(self.plot_point.id)
+                    if not self.plot_point:
+                        await interaction.response.send_message("This plot point no longer exists.", ephemeral=True)
+                        return
+
+                    if self.plot_point.status == status:
+                        view = None if status == 'Finished' else self.create_view_for_status()
+                        await self.update_message(interaction.message, view)
+                        await interaction.response.send_message(
+                            f"Plot point {self.plot_point.number} is already {status}.", ephemeral=True)
+                        return
+
+                    await action(interaction)
+
+                await self.events.publish('plot_point.changed', id=self.plot_point.id,
+                                          campaign_id=self.plot_point.campaign_id, number=self.plot_point.number,
+                                          title=self.plot_point.title, status=self.plot_point.status)
 
     @discord.ui.button(label="Activate", style=discord.ButtonStyle.green)
     async def activate_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._transition(interaction, self._activate, 'Active')
+
+    async def _activate(self, interaction: discord.Interaction):
         try:
             # Fetch the campaign and category
-            campaign = self.plot_point.campaign
-            category = self.bot.get_channel(int(campaign.plot_category_id))
+            campaign = await self.storage.get_campaign(self.plot_point.campaign_id)
+            category = self._category(campaign)
 
             # Create a new channel for the plot point
             plot_channel = await interaction.guild.create_text_channel(
@@ -47,19 +78,15 @@ class PlotPointManagementView(discord.ui.View):
             )
 
             # Update the plot point in the database
-            self.plot_point.status = 'Active'
-            self.plot_point.channel_id = str(plot_channel.id)
-            self.plot_point.save()
+            self.plot_point = await self.storage.update_plot_point(
+                self.plot_point.id, status='Active', channel_id=str(plot_channel.id))
 
             # Send initial description to the new channel
             await plot_channel.send(
                 f"**Plot Point {self.plot_point.number}: {self.plot_point.title}**\n{self.plot_point.description}")
 
             # Update the overview message
-            await interaction.message.edit(
-                embed=self.create_embed(),
-                view=self.create_view_for_status()
-            )
+            await self.update_message(interaction.message, self.create_view_for_status())
 
             await interaction.response.send_message(f"Activated plot point {self.plot_point.number}", ephemeral=True)
 
@@ -68,6 +95,9 @@ class PlotPointManagementView(discord.ui.View):
 
     @discord.ui.button(label="Deactivate", style=discord.ButtonStyle.gray)
     async def deactivate_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._transition(interaction, self._deactivate, 'Inactive')
+
+    async def _deactivate(self, interaction: discord.Interaction):
         try:
             # If the channel exists, delete it
             if self.plot_point.channel_id:
@@ -76,15 +106,11 @@ class PlotPointManagementView(discord.ui.View):
                     await channel.delete()
 
             # Update the plot point in the database
-            self.plot_point.status = 'Inactive'
-            self.plot_point.channel_id = None
-            self.plot_point.save()
+            self.plot_point = await self.storage.update_plot_point(self.plot_point.id, status='Inactive',
+                                                                   channel_id=None)
 
             # Update the overview message
-            await interaction.message.edit(
-                embed=self.create_embed(),
-                view=self.create_view_for_status()
-            )
+            await self.update_message(interaction.message, self.create_view_for_status())
 
             await interaction.response.send_message(f"Deactivated plot point {self.plot_point.number}", ephemeral=True)
 
@@ -93,10 +119,13 @@ class PlotPointManagementView(discord.ui.View):
 
     @discord.ui.button(label="Finished", style=discord.ButtonStyle.red)
     async def finished_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._transition(interaction, self._finished, 'Finished')
+
+    async def _finished(self, interaction: discord.Interaction):
         try:
             # Close all related channels
-            campaign = self.plot_point.campaign
-            category = self.bot.get_channel(int(campaign.plot_category_id))
+            campaign = await self.storage.get_campaign(self.plot_point.campaign_id)
+            category = self._category(campaign)
 
             # Delete the specific plot point channel
             if self.plot_point.channel_id:
@@ -105,23 +134,14 @@ class PlotPointManagementView(discord.ui.View):
                     await channel.delete()
 
             # Update the plot point in the database
-            self.plot_point.status = 'Finished'
-            self.plot_point.channel_id = None
-            self.plot_point.save()
+            self.plot_point = await self.storage.update_plot_point(self.plot_point.id, status='Finished',
+                                                                   channel_id=None)
 
             # Find the overview channel and update the message
-            overview_channel = discord.utils.get(category.text_channels, name="plot-overview")
-
-            # Update the overview embed to show finished status
-            embed = discord.Embed(
-                title=f"Plot Point {self.plot_point.number}: {self.plot_point.title}",
-                description=self.plot_point.description,
-                color=discord.Color.green()
-            )
-            embed.add_field(name="Status", value="Finished ✅")
+            overview_channel = discord.utils.get(category.text_channels, name="plot-overview") if category else None
 
             # Edit the original message to reflect finished status
-            await interaction.message.edit(embed=embed, view=None)
+            await self.update_message(interaction.message, None)
 
             await interaction.response.send_message(f"Marked plot point {self.plot_point.number} as Finished",
                                                     ephemeral=True)
@@ -129,15 +149,21 @@ class PlotPointManagementView(discord.ui.View):
         except Exception as e:
             await interaction.response.send_message(f"Error marking plot point as finished: {str(e)}", ephemeral=True)
 
+    def _category(self, campaign):
+        # None once the reconciler has cleared a deleted category; channels are then created without one
+        if not campaign.plot_category_id:
+            return None
+        return self.bot.get_channel(int(campaign.plot_category_id))
+
     def create_embed(self):
-        # Create an embed with plot point details
-        embed = discord.Embed(
-            title=f"Plot Point {self.plot_point.number}: {self.plot_point.title}",
-            description=self.plot_point.description,
-            color=discord.Color.blue()
-        )
-        embed.add_field(name="Status", value=self.plot_point.status)
-        return embed
+        # Rendered once per plot point version and reused from the cache
+        return plot_point_embed(self.plot_point)
+
+    async def update_message(self, message, view):
+        # Skip the edit if the message already shows this version, e.g. another process got there first
+        if message_shows(message, plot_point_payload(self.plot_point)):
+            return
+        await message.edit(embed=self.create_embed(), view=view)
 
     def create_view_for_status(self):
         # Create a view with buttons enabled/disabled based on current status
@@ -158,45 +184,64 @@ class PlotPointManagementView(discord.ui.View):
         return view
 
 
-class PlotPointCog(commands.Cog):
+class PlotPointBoardCog(commands.Cog):
+    """Posts plot points to the overview channel with Activate/Deactivate/Finished buttons"""
+
     def __init__(self, bot):
         self.bot = bot
-        db.connect()
-        db.create_tables([Campaign, PlotPoint])
-
-    def cog_unload(self):
-        db.close()
-
-    @commands.command(name='add_plot_point')
-    async def add_plot_point(self, ctx, number: str, title: str, *, description: str = None):
-        """Add a new plot point with a specific numbering system"""
-        # Find the most recent campaign (or create one if none exists)
+        self.storage = get_storage()
+        self.events = get_event_bus()
+
+    async def cog_load(self):
+        await self.storage.connect()
+        await self.storage.create_schema()
+        await self.events.start()
+        # Shared with other cogs, so they stay open until shutdown
+        lifecycle = get_lifecycle()
+        lifecycle.add_resource(self.storage.close)
+        lifecycle.add_resource(self.events.stop)
+
+    @commands.hybrid_command(name='post_plot_point')
+    @app_commands.describe(number="Plot point number, e.g. 01 or 03a")
+    async def post_plot_point(self, ctx, number: str, title: str, *, description: str = None):
+        """Add a plot point to the latest campaign and post it with management buttons
+
+        Usage: !post_plot_point <number> <title> [description]
+        Example: !post_plot_point 03a "Goblin Ambush" The caravan is attacked
+        """
         try:
-            campaign = Campaign.select().order_by(Campaign.id.desc()).first()
-            if not campaign:
-                campaign = Campaign.create(name=f"Westmarch {datetime.now().year}")
-
             # Validate plot point number format
             if not re.match(r'^\d+[a-z]?$', number):
                 await ctx.send("Invalid plot point number. Use format like '01', '02', '03a', '03b'")
                 return
 
+            # Creating channels can take longer than the interaction window
+            await ctx.defer()
+
+            # Find the most recent campaign (or create one if none exists)
+            campaign = await self.storage.latest_campaign()
+            if not campaign:
+                campaign = await self.storage.create_campaign(f"Westmarch {datetime.now().year}")
+                await self.events.publish('campaign.changed', id=campaign.id, name=campaign.name,
+                                          dm_id=campaign.dm_id)
+
             # Create category if not exists
             if not campaign.plot_category_id:
                 category = await ctx.guild.create_category_channel(f"{campaign.name} Plot Points")
-                campaign.plot_category_id = str(category.id)
-                campaign.save()
+                await self.storage.update_campaign(campaign.id, plot_category_id=str(category.id))
             else:
                 category = ctx.guild.get_channel(int(campaign.plot_category_id))
 
             # Create plot point in database (initially Inactive)
-            plot_point = PlotPoint.create(
-                campaign=campaign,
+            plot_point = await self.storage.create_plot_point(
+                campaign.id,
                 number=number,
                 title=title,
                 description=description or "No description provided.",
                 status='Inactive'  # Start in Inactive state
             )
+            await self.events.publish('plot_point.changed', id=plot_point.id, campaign_id=campaign.id,
+                                      number=number, title=title, status=plot_point.status)
 
             # Find or create overview channel
             overview_channel = discord.utils.get(category.text_channels, name="plot-overview")
@@ -210,12 +255,7 @@ class PlotPointCog(commands.Cog):
             view = PlotPointManagementView(plot_point, self.bot)
 
             # Create embed for the plot point
-            embed = discord.Embed(
-                title=f"Plot Point {number}: {title}",
-                description=description or "No description provided.",
-                color=discord.Color.blue()
-            )
-            embed.add_field(name="Status", value="Inactive")
+            embed = plot_point_embed(plot_point)
 
             # Send message to overview channel with buttons
             await overview_channel.send(embed=embed, view=view)
@@ -227,4 +267,4 @@ class PlotPointCog(commands.Cog):
 
 
 async def setup(bot):
-    await bot.add_cog(PlotPointCog(bot))
\ No newline at end of file
+    await bot.add_cog(PlotPointBoardCog(bot))
\ No newline at end of file
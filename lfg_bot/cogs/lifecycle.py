@@ -0,0 +1,59 @@
+import logging
+
+from discord.ext import commands
+
+from lfg_bot.errors.custom_errors import ShuttingDown
+from lfg_bot.utils.lifecycle import get_lifecycle
+
+log = logging.getLogger(__name__)
+
+
+class LifecycleCog(commands.Cog):
+    """Turns away commands during shutdown and reloads cogs without a restart"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.lifecycle = get_lifecycle()
+
+    async def bot_check(self, ctx):
+        if not self.lifecycle.accepting:
+            raise ShuttingDown()
+        return True
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        if isinstance(getattr(error, 'original', error), ShuttingDown):
+            message = "🔄 The bot is restarting. Try again in a few seconds."
+            if ctx.interaction:
+                await ctx.send(message, ephemeral=True)
+            else:
+                await ctx.send(message, delete_after=10)
+
+    @commands.command(name='reload')
+    @commands.is_owner()
+    async def reload_command(self, ctx, cog: str):
+        """Reload a cog once its running commands have finished
+
+        Usage: !reload <cog>
+        Example: !reload plot_points
+        """
+        name = cog if cog.startswith('lfg_bot.cogs.') else f'lfg_bot.cogs.{cog}'
+        if name not in self.bot.extensions:
+            await ctx.send(f"❌ Cog '{cog}' is not loaded.")
+            return
+
+        try:
+            drained = await self.lifecycle.reload(self.bot, name)
+            if drained:
+                await ctx.send(f"✅ Reloaded {cog}")
+            else:
+                await ctx.send(f"⚠️ Reloaded {cog}, but some of its commands were still running")
+
+        except Exception as e:
+            # reload_extension puts the old version back if the new one fails to load
+            await ctx.send(f"❌ Error reloading {cog}, kept the running version: {str(e)}")
+            log.exception("Reload Error: %s", e)
+
+
+async def setup(bot):
+    await bot.add_cog(LifecycleCog(bot))
@@ -1,46 +1,80 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
-from peewee import *
-from datetime import datetime
 import re
 
-# Database setup
-db = SqliteDatabase('campaigns_plotpoints.db')
-
-
-class BaseModel(Model):
-    class Meta:
-        database = db
-
-
-class Campaign(BaseModel):
-    name = CharField()
-    plot_category_id = CharField(null=True)
-    created_at = DateTimeField(default=datetime.now)
-    dm_id = CharField(null=True)  # Store the Discord ID of the DM
-
-
-class PlotPoint(BaseModel):
-    campaign = ForeignKeyField(Campaign, backref='plot_points')
-    number = CharField()
-    title = CharField()
-    description = TextField()
-    status = CharField(default='Inactive')
-    potential_players = TextField(null=True)
-    channel_id = CharField(null=True)
-    created_at = DateTimeField(default=datetime.now)
+from config.config import COALESCE_WINDOW_SECONDS
+from lfg_bot.database.storage import get_storage
+from lfg_bot.utils.autocomplete import campaign_index
+from lfg_bot.utils.embeds import plot_point_embed, plot_point_list_embed, status_label
+from lfg_bot.utils.events import get_event_bus
+from lfg_bot.utils.lifecycle import get_lifecycle
+from lfg_bot.utils.ratelimit import RequestCoalescer
 
 
 class PlotPointCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        db.connect()
-        db.create_tables([Campaign, PlotPoint])
-
-    def cog_unload(self):
-        db.close()
-
-    @commands.command(name='create_campaign')
+        self.storage = get_storage()
+        self.events = get_event_bus()
+        self.coalescer = RequestCoalescer(COALESCE_WINDOW_SECONDS)
+
+    async def cog_load(self):
+        await self.storage.connect()
+        await self.storage.create_schema()
+        await campaign_index.rebuild(self.storage)
+        self.events.subscribe('campaign.changed', self.on_campaign_changed)
+        self.events.subscribe('plot_point.changed', self.on_plot_point_changed)
+        self.events.subscribe('plot_point.deleted', self.on_plot_point_deleted)
+        await self.events.start()
+        # Shared with other cogs and kept open across reloads, closed at shutdown
+        lifecycle = get_lifecycle()
+        lifecycle.add_resource(self.storage.close)
+        lifecycle.add_resource(self.events.stop)
+
+    async def cog_unload(self):
+        self.events.unsubscribe('campaign.changed', self.on_campaign_changed)
+        self.events.unsubscribe('plot_point.changed', self.on_plot_point_changed)
+        self.events.unsubscribe('plot_point.deleted', self.on_plot_point_deleted)
+
+    # Events from this and other bot processes keep the autocomplete index
+    # and coalesced listings current
+
+    async def on_campaign_changed(self, id, name, dm_id, **_):
+        campaign_index.add_campaign(id, name, dm_id)
+        self.coalescer.invalidate()
+
+    async def on_plot_point_changed(self, id, campaign_id, number, title, **_):
+        campaign_index.add_plot_point(id, campaign_id, number, title)
+        self.coalescer.invalidate()
+
+    async def on_plot_point_deleted(self, id, **_):
+        campaign_index.remove_plot_point(id)
+        self.coalescer.invalidate()
+
+    async def send_coalesced(self, ctx, key, build):
+        """Send build()'s message once for a burst of identical read commands
+
+        Repeats of the same listing in the same channel within the coalescing
+        window share the first one's query and reply instead of posting again.
+        """
+        message, leader = await self.coalescer.run(key, build)
+        if leader:
+            await ctx.send(**message)
+        elif ctx.interaction:
+            await ctx.send("👆 This list was just posted above.", ephemeral=True)
+        else:
+            await ctx.message.add_reaction("👆")
+
+    async def campaign_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=label, value=campaign_id)
+                for label, campaign_id in campaign_index.campaign_choices(current, interaction.user.id)]
+
+    async def plot_point_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=label, value=plot_id)
+                for label, plot_id in campaign_index.plot_point_choices(current, interaction.user.id)]
+
+    @commands.hybrid_command(name='create_campaign')
     async def create_campaign(self, ctx, *, name: str = None):
         """Create a new campaign
 
@@ -53,15 +87,15 @@ class PlotPointCog(commands.Cog):
 
         try:
             # Create new campaign
-            campaign = Campaign.create(
-                name=name,
-                dm_id=str(ctx.author.id)
-            )
+            # Creating channels can take longer than the 3 second interaction window
+            await ctx.defer()
+
+            campaign = await self.storage.create_campaign(name, dm_id=str(ctx.author.id))
+            await self.events.publish('campaign.changed', id=campaign.id, name=campaign.name, dm_id=campaign.dm_id)
 
             # Create category for the campaign
             category = await ctx.guild.create_category_channel(f"{name} Plot Points")
-            campaign.plot_category_id = str(category.id)
-            campaign.save()
+            await self.storage.update_campaign(campaign.id, plot_category_id=str(category.id))
 
             # Create overview channel
             overview_channel = await ctx.guild.create_text_channel(
@@ -75,19 +109,18 @@ class PlotPointCog(commands.Cog):
             await ctx.send(f"❌ Error creating campaign: {str(e)}")
             print(f"Campaign Creation Error: {e}")
 
-    @commands.command(name='list_campaigns')
+    @commands.hybrid_command(name='list_campaigns')
     async def list_campaigns(self, ctx):
         """List all campaigns you have created
 
         Usage: !list_campaigns
         """
-        try:
+        async def build():
             # Find campaigns created by this user
-            campaigns = Campaign.select().where(Campaign.dm_id == str(ctx.author.id))
+            campaigns = await self.storage.list_campaigns_for_dm(str(ctx.author.id))
 
             if not campaigns:
-                await ctx.send("You haven't created any campaigns yet.")
-                return
+                return {'content': "You haven't created any campaigns yet."}
 
             embed = discord.Embed(
                 title="Your Campaigns",
@@ -95,21 +128,24 @@ class PlotPointCog(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            for campaign in campaigns:
-                plot_count = PlotPoint.select().where(PlotPoint.campaign == campaign).count()
+            for campaign, plot_count in campaigns:
                 embed.add_field(
                     name=f"ID: {campaign.id} - {campaign.name}",
                     value=f"Created: {campaign.created_at.strftime('%Y-%m-%d')}\nPlot Points: {plot_count}",
                     inline=False
                 )
 
-            await ctx.send(embed=embed)
+            return {'embed': embed}
+
+        try:
+            await self.send_coalesced(ctx, ('list_campaigns', ctx.author.id, ctx.channel.id), build)
 
         except Exception as e:
             await ctx.send(f"❌ Error listing campaigns: {str(e)}")
             print(f"List Campaigns Error: {e}")
 
-    @commands.command(name='add_plot_point')
+    @commands.hybrid_command(name='add_plot_point')
+    @app_commands.describe(campaign_id="Campaign to add the plot point to", number="Plot point number, e.g. 01 or 03a")
     async def add_plot_point(self, ctx, campaign_id: int = None, number: str = None, title: str = None, *,
                              description: str = None):
         """Add a new plot point to a specific campaign
@@ -132,35 +168,32 @@ class PlotPointCog(commands.Cog):
                 await ctx.send("❌ Invalid plot point number. Use format like '01', '02', '03a', '03b'")
                 return
 
-            # Find the campaign
-            try:
-                campaign = Campaign.get(Campaign.id == campaign_id)
-
-                # Check if the user is the DM of this campaign
-                if campaign.dm_id and campaign.dm_id != str(ctx.author.id):
-                    await ctx.send("❌ You don't have permission to add plot points to this campaign.")
-                    return
+            await ctx.defer()
 
-            except DoesNotExist:
+            # Find the campaign
+            campaign = await self.storage.get_campaign(campaign_id)
+            if not campaign:
                 await ctx.send(f"❌ Campaign with ID {campaign_id} not found.")
                 return
 
+            # Check if the user is the DM of this campaign
+            if campaign.dm_id and campaign.dm_id != str(ctx.author.id):
+                await ctx.send("❌ You don't have permission to add plot points to this campaign.")
+                return
+
             # Create plot point in database
-            plot_point = PlotPoint.create(
-                campaign=campaign,
+            plot_point = await self.storage.create_plot_point(
+                campaign.id,
                 number=number,
                 title=title,
                 description=description,
                 status='Inactive'
             )
+            await self.events.publish('plot_point.changed', id=plot_point.id, campaign_id=campaign.id,
+                                      number=number, title=title, status=plot_point.status)
 
             # Create an embed for the plot point
-            embed = discord.Embed(
-                title=f"Plot Point {number}: {title}",
-                description=description,
-                color=discord.Color.blue()
-            )
-            embed.add_field(name="Status", value="🔘 Inactive", inline=False)
+            embed = plot_point_embed(plot_point)
 
             # Find or create overview channel
             category = None
@@ -169,8 +202,7 @@ class PlotPointCog(commands.Cog):
 
             if not category:
                 category = await ctx.guild.create_category_channel(f"{campaign.name} Plot Points")
-                campaign.plot_category_id = str(category.id)
-                campaign.save()
+                await self.storage.update_campaign(campaign.id, plot_category_id=str(category.id))
 
             overview_channel = discord.utils.get(category.text_channels, name="plot-overview")
             if not overview_channel:
@@ -189,56 +221,38 @@ class PlotPointCog(commands.Cog):
             # Log the full error for debugging
             print(f"Plot Point Creation Error: {e}")
 
-    @commands.command(name='list_plot_points')
+    @commands.hybrid_command(name='list_plot_points')
+    @app_commands.describe(campaign_id="Campaign to list")
     async def list_plot_points(self, ctx, campaign_id: int):
         """List all plot points for a specific campaign
 
         Usage: !list_plot_points <campaign_id>
         Example: !list_plot_points 1
         """
-        try:
+        async def build():
             # Find the campaign
-            try:
-                campaign = Campaign.get(Campaign.id == campaign_id)
-            except DoesNotExist:
-                await ctx.send(f"❌ Campaign with ID {campaign_id} not found.")
-                return
-
-            # Get plot points for this campaign
-            plot_points = PlotPoint.select().where(PlotPoint.campaign == campaign).order_by(PlotPoint.number)
-
-            if not plot_points:
-                await ctx.send(f"No plot points found for campaign '{campaign.name}'")
-                return
+            campaign = await self.storage.get_campaign(campaign_id)
+            if not campaign:
+                return {'content': f"❌ Campaign with ID {campaign_id} not found."}
 
-            # Create embed
-            embed = discord.Embed(
-                title=f"Plot Points for {campaign.name}",
-                description=f"Campaign ID: {campaign.id}",
-                color=discord.Color.blue()
-            )
+            # Plot points are only loaded if this campaign version isn't rendered yet
+            embed = await plot_point_list_embed(campaign, lambda: self.storage.list_plot_points(campaign.id))
 
-            for plot in plot_points:
-                # Create status emoji
-                status_emoji = "🔘"  # Default Inactive
-                if plot.status == "Active":
-                    status_emoji = "🟢"
-                elif plot.status == "Complete":
-                    status_emoji = "✅"
+            if not embed:
+                return {'content': f"No plot points found for campaign '{campaign.name}'"}
 
-                embed.add_field(
-                    name=f"{plot.number}: {plot.title} ({status_emoji} {plot.status})",
-                    value=f"{plot.description[:100]}..." if len(plot.description) > 100 else plot.description,
-                    inline=False
-                )
+            return {'embed': embed}
 
-            await ctx.send(embed=embed)
+        try:
+            await self.send_coalesced(ctx, ('list_plot_points', campaign_id, ctx.channel.id), build)
 
         except Exception as e:
             await ctx.send(f"❌ Error listing plot points: {str(e)}")
             print(f"List Plot Points Error: {e}")
 
-    @commands.command(name='update_plot_status')
+    @commands.hybrid_command(name='update_plot_status')
+    @app_commands.describe(plot_id="Plot point to update")
+    @app_commands.choices(status=[app_commands.Choice(name=s, value=s) for s in ["Inactive", "Active", "Complete"]])
     async def update_plot_status(self, ctx, plot_id: int, status: str):
         """Update the status of a plot point
 
@@ -255,32 +269,25 @@ class PlotPointCog(commands.Cog):
 
         try:
             # Find the plot point
-            try:
-                plot_point = PlotPoint.get(PlotPoint.id == plot_id)
-            except DoesNotExist:
+            plot_point = await self.storage.get_plot_point(plot_id)
+            if not plot_point:
                 await ctx.send(f"❌ Plot point with ID {plot_id} not found.")
                 return
 
             # Check if user is the DM
-            campaign = plot_point.campaign
+            campaign = await self.storage.get_campaign(plot_point.campaign_id)
             if campaign.dm_id and campaign.dm_id != str(ctx.author.id):
                 await ctx.send("❌ You don't have permission to update this plot point.")
                 return
 
             # Update status
             old_status = plot_point.status
-            plot_point.status = status
-            plot_point.save()
-
-            # Create status emoji
-            status_emoji = "🔘"  # Default Inactive
-            if status == "Active":
-                status_emoji = "🟢"
-            elif status == "Complete":
-                status_emoji = "✅"
+            plot_point = await self.storage.update_plot_point(plot_id, status=status)
+            await self.events.publish('plot_point.changed', id=plot_point.id, campaign_id=campaign.id,
+                                      number=plot_point.number, title=plot_point.title, status=status)
 
             await ctx.send(
-                f"✅ Updated plot point {plot_point.number}: '{plot_point.title}' status from '{old_status}' to '{status_emoji} {status}'")
+                f"✅ Updated plot point {plot_point.number}: '{plot_point.title}' status from '{old_status}' to '{status_label(status)}'")
 
             # Update message in overview channel if possible
             if campaign.plot_category_id and plot_point.channel_id:
@@ -289,18 +296,10 @@ class PlotPointCog(commands.Cog):
                     if category:
                         overview_channel = discord.utils.get(category.text_channels, name="plot-overview")
                         if overview_channel:
-                            # Create updated embed
-                            embed = discord.Embed(
-                                title=f"Plot Point {plot_point.number}: {plot_point.title}",
-                                description=plot_point.description,
-                                color=discord.Color.blue()
-                            )
-                            embed.add_field(name="Status", value=f"{status_emoji} {status}", inline=False)
-
-                            # Note: This would require storing message IDs to update specific messages
+                            # Note: Editing the original embed would require storing message IDs
                             # For now, just send a status update
                             await overview_channel.send(
-                                f"**Status Update**: Plot point {plot_point.number} is now {status_emoji} {status}")
+                                f"**Status Update**: Plot point {plot_point.number} is now {status_label(status)}")
                 except Exception as e:
                     print(f"Error updating overview message: {e}")
 
@@ -308,7 +307,8 @@ class PlotPointCog(commands.Cog):
             await ctx.send(f"❌ Error updating plot point: {str(e)}")
             print(f"Update Plot Status Error: {e}")
 
-    @commands.command(name='delete_plot_point')
+    @commands.hybrid_command(name='delete_plot_point')
+    @app_commands.describe(plot_id="Plot point to delete")
     async def delete_plot_point(self, ctx, plot_id: int):
         """Delete a plot point
 
@@ -317,14 +317,13 @@ class PlotPointCog(commands.Cog):
         """
         try:
             # Find the plot point
-            try:
-                plot_point = PlotPoint.get(PlotPoint.id == plot_id)
-            except DoesNotExist:
+            plot_point = await self.storage.get_plot_point(plot_id)
+            if not plot_point:
                 await ctx.send(f"❌ Plot point with ID {plot_id} not found.")
                 return
 
             # Check if user is the DM
-            campaign = plot_point.campaign
+            campaign = await self.storage.get_campaign(plot_point.campaign_id)
             if campaign.dm_id and campaign.dm_id != str(ctx.author.id):
                 await ctx.send("❌ You don't have permission to delete this plot point.")
                 return
@@ -334,7 +333,8 @@ class PlotPointCog(commands.Cog):
             plot_title = plot_point.title
 
             # Delete the plot point
-            plot_point.delete_instance()
+            await self.storage.delete_plot_point(plot_id)
+            await self.events.publish('plot_point.deleted', id=plot_id, campaign_id=campaign.id)
 
             await ctx.send(f"✅ Deleted plot point {plot_number}: '{plot_title}'")
 
@@ -343,6 +343,12 @@ class PlotPointCog(commands.Cog):
             print(f"Delete Plot Point Error: {e}")
 
 
+    add_plot_point.autocomplete('campaign_id')(campaign_autocomplete)
+    list_plot_points.autocomplete('campaign_id')(campaign_autocomplete)
+    update_plot_status.autocomplete('plot_id')(plot_point_autocomplete)
+    delete_plot_point.autocomplete('plot_id')(plot_point_autocomplete)
+
+
 async def setup(bot):
     # Check if the cog is already loaded
     if not bot.get_cog('PlotPointCog'):
@@ -0,0 +1,53 @@
+import math
+
+from discord.ext import commands
+
+from config.config import RATE_LIMIT_PER_COMMAND, RATE_LIMIT_PER_GUILD, RATE_LIMIT_PER_USER
+from lfg_bot.errors.custom_errors import RateLimited
+from lfg_bot.utils.ratelimit import TokenBucketLimiter, parse_rate
+
+
+class RateLimitCog(commands.Cog):
+    """Token-bucket limits on every command, per user, per guild and per command"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.limiters = [
+            ('user', TokenBucketLimiter(*parse_rate(RATE_LIMIT_PER_USER)),
+             lambda ctx: ctx.author.id),
+            ('server', TokenBucketLimiter(*parse_rate(RATE_LIMIT_PER_GUILD)),
+             lambda ctx: ctx.guild.id if ctx.guild else None),
+            ('command', TokenBucketLimiter(*parse_rate(RATE_LIMIT_PER_COMMAND)),
+             lambda ctx: (ctx.command.qualified_name, ctx.guild.id if ctx.guild else ctx.author.id)),
+        ]
+
+    async def bot_check(self, ctx):
+        # Check every bucket before consuming any, so a rejected command costs nothing
+        keys = []
+        for scope, limiter, key_for in self.limiters:
+            key = key_for(ctx)
+            if key is None:
+                continue
+            retry_after = limiter.retry_after(key)
+            if retry_after:
+                raise RateLimited(scope, retry_after)
+            keys.append((limiter, key))
+
+        for limiter, key in keys:
+            limiter.consume(key)
+        return True
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        error = getattr(error, 'original', error)
+        if isinstance(error, RateLimited):
+            message = (f"⏳ Slow down! Too many commands for this {error.scope}. "
+                       f"Try again in {math.ceil(error.retry_after)}s.")
+            if ctx.interaction:
+                await ctx.send(message, ephemeral=True)
+            else:
+                await ctx.send(message, delete_after=10)
+
+
+async def setup(bot):
+    await bot.add_cog(RateLimitCog(bot))
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands, tasks
+
+from config.config import RECONCILE_INTERVAL_MINUTES
+from lfg_bot.database.storage import get_storage
+
+log = logging.getLogger(__name__)
+
+CATEGORY_SUFFIX = " Plot Points"
+
+
+class ReconcileReport:
+    """Summary of one reconciliation pass"""
+
+    def __init__(self):
+        self.guilds_checked = 0
+        self.skipped_guilds = []
+        self.cleared_categories = []
+        self.deactivated_plot_points = []
+        self.cleared_plot_channels = []
+        self.orphaned_categories = []
+        self.partial_shards = False  # This process doesn't run every shard, so nothing was checked
+
+    @property
+    def drift_found(self):
+        return bool(self.cleared_categories or self.deactivated_plot_points
+                    or self.cleared_plot_channels or self.orphaned_categories)
+
+    def summary(self):
+        return (
+            f"Checked {self.guilds_checked} guild(s): "
+            f"{len(self.cleared_categories)} missing campaign categories cleared, "
+            f"{len(self.deactivated_plot_points)} active plot points deactivated, "
+            f"{len(self.cleared_plot_channels)} stale plot channels cleared, "
+            f"{len(self.orphaned_categories)} orphaned categories flagged"
+        )
+
+
+async def reconcile_channels(storage, referenced, guild_channels, report=None):
+    """Compare live channels with every channel id referenced in the database
+
+    referenced is storage.referenced_channels() read before the channels
+    were fetched, and guild_channels maps each checked guild id to the list
+    of channels fetched for it. Campaigns are not stored per guild, so an
+    id is only treated as missing when no checked guild has it.
+    """
+    report = report or ReconcileReport()
+
+    live_ids = set()
+    categories = []
+    for channels in guild_channels.values():
+        for channel in channels:
+            live_ids.add(str(channel.id))
+            if isinstance(channel, discord.CategoryChannel):
+                categories.append(channel)
+    report.guilds_checked += len(guild_channels)
+
+    campaign_rows, plot_rows = referenced
+    stale_categories = []
+    stale_channels = []
+
+    referenced_categories = set()
+    for campaign_id, category_id in campaign_rows:
+        referenced_categories.add(category_id)
+        if category_id not in live_ids:
+            report.cleared_categories.append(campaign_id)
+            stale_categories.append((campaign_id, category_id))
+
+    for plot_id, status, channel_id in plot_rows:
+        if channel_id in live_ids:
+            continue
+        stale_channels.append((plot_id, channel_id))
+        if status == 'Active':
+            report.deactivated_plot_points.append(plot_id)
+        else:
+            report.cleared_plot_channels.append(plot_id)
+
+    # Categories left behind when add_plot_point recreated a missing one
+    for category in categories:
+        if category.name.endswith(CATEGORY_SUFFIX) and str(category.id) not in referenced_categories:
+            report.orphaned_categories.append(category)
+
+    # Only rows still holding the stale ids change, the rest moved on since the read
+    await storage.clear_channel_references(campaign_categories=stale_categories, plot_channels=stale_channels)
+
+    return report
+
+
+def sees_every_guild(bot):
+    """Whether this process runs every shard, and so is in every guild the bot is in
+
+    Campaigns are not stored per guild, so a process that only sees some
+    guilds can't tell a deleted channel from one in another shard's guild.
+    """
+    shard_count = getattr(bot, 'shard_count', None) or 1
+    if shard_count == 1:
+        return True
+    if isinstance(bot, discord.AutoShardedClient):
+        # No shard_ids means it launches all of them
+        return bot.shard_ids is None or set(range(shard_count)) <= set(bot.shard_ids)
+    return False
+
+
+class ReconcilerCog(commands.Cog):
+    """Keeps stored channel and category ids in sync with Discord"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+        self._lock = asyncio.Lock()
+        self._seen_ready = False
+        self._warned_partial = False
+
+    async def cog_load(self):
+        self.reconcile_loop.start()
+
+    async def cog_unload(self):
+        self.reconcile_loop.cancel()
+
+    async def reconcile(self):
+        """Run a single pass, fetching each guild's channel list once"""
+        async with self._lock:
+            report = ReconcileReport()
+            if not sees_every_guild(self.bot):
+                if not self._warned_partial:
+                    log.warning("Skipping reconciliation, this process only runs some of the bot's %d shards",
+                                self.bot.shard_count)
+                    self._warned_partial = True
+                report.partial_shards = True
+                return report
+
+            # Read before fetching, so anything created during the fetch isn't in it and can't look missing
+            referenced = await self.storage.referenced_channels()
+            guild_channels = {}
+            for guild in self.bot.guilds:
+                # An outage would make every channel look deleted; leave it for the next pass
+                if guild.unavailable:
+                    report.skipped_guilds.append(guild.id)
+                    continue
+                try:
+                    guild_channels[guild.id] = await guild.fetch_channels()
+                except discord.HTTPException as e:
+                    log.warning("Could not fetch channels for guild %s: %s", guild.id, e)
+                    report.skipped_guilds.append(guild.id)
+
+            if report.skipped_guilds:
+                # Ids are not scoped per guild, so a partial view could clear live references
+                log.warning("Skipping reconciliation, %d guild(s) unavailable", len(report.skipped_guilds))
+                return report
+
+            await reconcile_channels(self.storage, referenced, guild_channels, report)
+            for category in report.orphaned_categories:
+                log.warning("Orphaned plot category %s (%s) in guild %s",
+                            category.name, category.id, category.guild.id)
+            if report.drift_found:
+                log.info(report.summary())
+            return report
+
+    @tasks.loop(minutes=RECONCILE_INTERVAL_MINUTES)
+    async def reconcile_loop(self):
+        try:
+            await self.reconcile()
+        except Exception as e:
+            log.exception("Reconciliation Error: %s", e)
+
+    @reconcile_loop.before_loop
+    async def before_reconcile_loop(self):
+        await self.bot.wait_until_ready()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # The loop's first iteration already runs on the initial ready;
+        # later on_ready events mean we reconnected and may have missed deletes
+        if not self._seen_ready:
+            self._seen_ready = True
+            return
+        try:
+            await self.reconcile()
+        except Exception as e:
+            log.exception("Reconciliation Error: %s", e)
+
+    @commands.command(name='reconcile')
+    @commands.is_owner()
+    async def reconcile_command(self, ctx):
+        """Check stored channel ids against Discord right now
+
+        Usage: !reconcile
+        """
+        try:
+            report = await self.reconcile()
+            if report.partial_shards:
+                await ctx.send("⚠️ Skipped: this process only runs some of the bot's shards, "
+                               "so channels in other shards' guilds would look deleted.")
+                return
+            if report.skipped_guilds:
+                await ctx.send(f"⚠️ Skipped: {len(report.skipped_guilds)} guild(s) are unavailable. Try again later.")
+                return
+
+            message = f"✅ {report.summary()}"
+            if report.orphaned_categories:
+                names = ', '.join(f"'{c.name}'" for c in report.orphaned_categories[:10])
+                message += f"\nOrphaned categories (not deleted): {names}"
+            await ctx.send(message)
+
+        except Exception as e:
+            await ctx.send(f"❌ Error reconciling channels: {str(e)}")
+            log.exception("Reconcile Error: %s", e)
+
+
+async def setup(bot):
+    await bot.add_cog(ReconcilerCog(bot))
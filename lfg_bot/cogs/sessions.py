@@ -0,0 +1,337 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from config.config import REMINDER_HORIZON_MINUTES, REMINDER_MAX_ATTEMPTS, REMINDER_OFFSETS_MINUTES
+from lfg_bot.database.storage import get_storage
+from lfg_bot.utils.autocomplete import campaign_index
+from lfg_bot.utils.lifecycle import get_lifecycle
+
+log = logging.getLogger(__name__)
+
+SESSION_TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+# Delay before the first retry of a failed reminder, doubled for each one after
+REMINDER_RETRY_DELAY = timedelta(minutes=1)
+
+
+class ReminderScheduler:
+    """Fires reminders from an in-memory heap holding only the next horizon
+
+    The reminder table is the source of truth. Every horizon the scheduler
+    loads pending rows due before the end of the next window using the
+    (status, fire_at) index, so pending reminders further out are never
+    read. A reminder is claimed with a conditional UPDATE before it is sent,
+    so neither a restart nor another bot process sharing the database sends
+    it twice; rows that came due while the bot was
+    offline are picked up by the first load and sent late, unless their
+    session has already started. A send that fails puts the row back to
+    Pending with a later fire_at, until max_attempts is reached or Discord
+    refuses it for good (DMs closed, channel gone), and then marks it Failed.
+    """
+
+    def __init__(self, storage, send_reminder, horizon=timedelta(minutes=REMINDER_HORIZON_MINUTES),
+                 max_attempts=REMINDER_MAX_ATTEMPTS):
+        self.storage = storage
+        self.send_reminder = send_reminder
+        self.horizon = horizon
+        self.max_attempts = max_attempts
+        self._heap = []
+        self._queued = {}
+        self._loaded_until = None
+        self._wake = asyncio.Event()
+
+    def __len__(self):
+        return len(self._queued)
+
+    def _push(self, reminder_id, fire_at):
+        if self._queued.get(reminder_id) == fire_at:
+            return
+        self._queued[reminder_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, reminder_id))
+
+    async def load_horizon(self, now):
+        """Queue pending reminders due before now + horizon"""
+        self._loaded_until = now + self.horizon
+        for reminder_id, fire_at in await self.storage.pending_reminders(self._loaded_until):
+            self._push(reminder_id, fire_at)
+
+    def schedule(self, reminder_id, fire_at):
+        """Queue a newly created reminder if it falls inside the loaded window"""
+        if self._loaded_until is not None and fire_at <= self._loaded_until:
+            self._push(reminder_id, fire_at)
+            self._wake.set()
+
+    def cancel(self, reminder_ids):
+        # Heap entries are dropped lazily when they reach the top
+        for reminder_id in reminder_ids:
+            self._queued.pop(reminder_id, None)
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, reminder_id = heapq.heappop(self._heap)
+            if self._queued.get(reminder_id) == fire_at:
+                del self._queued[reminder_id]
+                due.append(reminder_id)
+        return due
+
+    def _next_wakeup(self):
+        # Skip cancelled entries so we don't wake up for nothing
+        while self._heap and self._queued.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if self._heap:
+            return min(self._heap[0][0], self._loaded_until)
+        return self._loaded_until
+
+    async def fire(self, reminder_id, now):
+        if not await self.storage.claim_reminder(reminder_id, now):
+            return  # cancelled, or already handled before a restart or by another process
+
+        reminder = await self.storage.get_reminder(reminder_id)
+        session = reminder and await self.storage.get_session(reminder.session_id)
+        plot_point = session and await self.storage.get_plot_point(session.plot_point_id)
+        if not plot_point:
+            # Its session or plot point went away; the claim marked it Sent but nothing was sent
+            if reminder:
+                await self.storage.update_reminder(reminder_id, status='Skipped')
+            return
+
+        if session.starts_at <= now:
+            await self.storage.update_reminder(reminder_id, status='Skipped')
+            return
+
+        campaign = await self.storage.get_campaign(plot_point.campaign_id)
+        try:
+            await self.send_reminder(reminder, session, plot_point, campaign)
+        except Exception as e:
+            await self._failed(reminder, session, now, e)
+
+    async def _failed(self, reminder, session, now, error):
+        attempts = reminder.attempts + 1
+        retry_at = now + REMINDER_RETRY_DELAY * 2 ** (attempts - 1)
+        # Forbidden and NotFound won't go away by trying again
+        permanent = isinstance(error, (discord.Forbidden, discord.NotFound))
+        if permanent or attempts >= self.max_attempts or retry_at >= session.starts_at:
+            log.warning("Failed to send reminder %s, giving up after %d attempt(s): %s",
+                        reminder.id, attempts, error)
+            await self.storage.update_reminder(reminder.id, status='Failed', attempts=attempts)
+            return
+
+        log.warning("Failed to send reminder %s, retrying at %s: %s", reminder.id, retry_at, error)
+        await self.storage.update_reminder(reminder.id, status='Pending', sent_at=None, attempts=attempts,
+                                           fire_at=retry_at)
+        self.schedule(reminder.id, retry_at)
+
+    async def fire_due(self, now):
+        """Load the next horizon if the current one has passed, then fire every due reminder"""
+        if self._loaded_until is None or now >= self._loaded_until:
+            await self.load_horizon(now)
+
+        for reminder_id in self._pop_due(now):
+            await self.fire(reminder_id, now)
+
+    async def run(self):
+        while True:
+            await self.fire_due(datetime.now())
+
+            delay = (self._next_wakeup() - datetime.now()).total_seconds()
+            if delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+
+def format_starts_at(starts_at):
+    return discord.utils.format_dt(starts_at.astimezone(), style='F')
+
+
+class SessionCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.storage = get_storage()
+        self.scheduler = ReminderScheduler(self.storage, self.send_reminder)
+        self._scheduler_task = None
+
+    async def cog_load(self):
+        await self.storage.connect()
+        await self.storage.create_schema()
+        get_lifecycle().add_resource(self.storage.close)
+        self._scheduler_task = asyncio.create_task(self._run_scheduler())
+
+    async def cog_unload(self):
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+
+    async def _run_scheduler(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.scheduler.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Reminder Scheduler Error: %s", e)
+                await asyncio.sleep(30)
+
+    async def _get_channel(self, channel_id):
+        # With several bot processes the channel's guild may belong to another
+        # one; it isn't cached here, but it can still be reached over REST
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(channel_id)
+            except discord.NotFound:
+                return None
+        return channel
+
+    async def send_reminder(self, reminder, session, plot_point, campaign):
+        message = (f"⏰ Reminder: Plot Point {plot_point.number}: {plot_point.title} "
+                   f"({campaign.name}) starts {format_starts_at(session.starts_at)}")
+
+        if reminder.kind == 'dm':
+            if campaign.dm_id:
+                user = self.bot.get_user(int(campaign.dm_id)) or await self.bot.fetch_user(int(campaign.dm_id))
+                await user.send(message)
+            return
+
+        # Channel reminders go to the plot point channel, or the overview channel while it is inactive
+        channel = None
+        if plot_point.channel_id:
+            channel = await self._get_channel(int(plot_point.channel_id))
+        if not channel and campaign.plot_category_id:
+            category = await self._get_channel(int(campaign.plot_category_id))
+            if category:
+                channels = category.text_channels or [
+                    c for c in await category.guild.fetch_channels() if c.category_id == category.id]
+                channel = discord.utils.get(channels, name="plot-overview")
+        if channel:
+            await channel.send(message)
+
+    async def plot_point_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=label, value=plot_id)
+                for label, plot_id in campaign_index.plot_point_choices(current, interaction.user.id)]
+
+    @commands.hybrid_command(name='schedule_session')
+    @app_commands.describe(plot_id="Plot point the session is for", starts_at="Start time as YYYY-MM-DD HH:MM")
+    async def schedule_session(self, ctx, plot_id: int, *, starts_at: str):
+        """Schedule a session for a plot point and set up reminders
+
+        Usage: !schedule_session <plot_id> <YYYY-MM-DD HH:MM>
+        Example: !schedule_session 1 2025-03-14 19:30
+        """
+        try:
+            try:
+                start = datetime.strptime(starts_at.strip(), SESSION_TIME_FORMAT)
+            except ValueError:
+                await ctx.send("❌ Invalid start time. Use format `YYYY-MM-DD HH:MM`, e.g. `2025-03-14 19:30`")
+                return
+
+            now = datetime.now()
+            if start <= now:
+                await ctx.send("❌ The session start time must be in the future.")
+                return
+
+            plot_point = await self.storage.get_plot_point(plot_id)
+            if not plot_point:
+                await ctx.send(f"❌ Plot point with ID {plot_id} not found.")
+                return
+
+            campaign = await self.storage.get_campaign(plot_point.campaign_id)
+            if campaign.dm_id and campaign.dm_id != str(ctx.author.id):
+                await ctx.send("❌ You don't have permission to schedule sessions for this plot point.")
+                return
+
+            reminders = []
+            for offset in REMINDER_OFFSETS_MINUTES:
+                fire_at = start - timedelta(minutes=offset)
+                if fire_at > now:
+                    reminders.extend((kind, offset, fire_at) for kind in ('dm', 'channel'))
+            session, reminders = await self.storage.create_session(plot_point.id, start, reminders)
+            for reminder in reminders:
+                self.scheduler.schedule(reminder.id, reminder.fire_at)
+
+            await ctx.send(
+                f"✅ Scheduled session {session.id} for plot point {plot_point.number}: '{plot_point.title}' "
+                f"starting {format_starts_at(start)}")
+
+        except Exception as e:
+            await ctx.send(f"❌ Error scheduling session: {str(e)}")
+            log.exception("Schedule Session Error: %s", e)
+
+    @commands.hybrid_command(name='list_sessions')
+    @app_commands.describe(plot_id="Plot point to list sessions for")
+    async def list_sessions(self, ctx, plot_id: int):
+        """List upcoming sessions for a plot point
+
+        Usage: !list_sessions <plot_id>
+        Example: !list_sessions 1
+        """
+        try:
+            plot_point = await self.storage.get_plot_point(plot_id)
+            if not plot_point:
+                await ctx.send(f"❌ Plot point with ID {plot_id} not found.")
+                return
+
+            sessions = await self.storage.list_sessions(plot_point.id, datetime.now())
+
+            if not sessions:
+                await ctx.send(f"No upcoming sessions for plot point {plot_point.number}: '{plot_point.title}'")
+                return
+
+            embed = discord.Embed(
+                title=f"Sessions for Plot Point {plot_point.number}: {plot_point.title}",
+                color=discord.Color.blue()
+            )
+            for session in sessions:
+                embed.add_field(name=f"Session {session.id}", value=format_starts_at(session.starts_at),
+                                inline=False)
+
+            await ctx.send(embed=embed)
+
+        except Exception as e:
+            await ctx.send(f"❌ Error listing sessions: {str(e)}")
+            log.exception("List Sessions Error: %s", e)
+
+    @commands.hybrid_command(name='cancel_session')
+    @app_commands.describe(session_id="Session to cancel")
+    async def cancel_session(self, ctx, session_id: int):
+        """Cancel a scheduled session and its reminders
+
+        Usage: !cancel_session <session_id>
+        Example: !cancel_session 1
+        """
+        try:
+            session = await self.storage.get_session(session_id)
+            if not session:
+                await ctx.send(f"❌ Session with ID {session_id} not found.")
+                return
+
+            # A session left behind by a deleted plot point has no DM to check against
+            plot_point = await self.storage.get_plot_point(session.plot_point_id)
+            campaign = plot_point and await self.storage.get_campaign(plot_point.campaign_id)
+            if campaign and campaign.dm_id and campaign.dm_id != str(ctx.author.id):
+                await ctx.send("❌ You don't have permission to cancel this session.")
+                return
+
+            self.scheduler.cancel(await self.storage.delete_session(session.id))
+
+            await ctx.send(f"✅ Cancelled session {session_id}")
+
+        except Exception as e:
+            await ctx.send(f"❌ Error cancelling session: {str(e)}")
+            log.exception("Cancel Session Error: %s", e)
+
+    schedule_session.autocomplete('plot_id')(plot_point_autocomplete)
+    list_sessions.autocomplete('plot_id')(plot_point_autocomplete)
+
+
+async def setup(bot):
+    await bot.add_cog(SessionCog(bot))
@@ -1,12 +1,10 @@
 from peewee import *
-import os
+from playhouse.migrate import SqliteMigrator, migrate
 
-# Get the directory where the database file should be located
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-db_path = os.path.join(base_dir, 'campaigns_plotpoints.db')
+from config.config import DATABASE_PATH
 
 # Create database connection
-db = SqliteDatabase(db_path)
+db = SqliteDatabase(DATABASE_PATH)
 
 class BaseModel(Model):
     class Meta:
@@ -14,11 +12,36 @@ class BaseModel(Model):
 
 
 # Import models to make them available
-from .models import Campaign, PlotPoint
+from .models import Campaign, PlotPoint, Reminder, Session
+
+# Columns added after their table first shipped, created on startup if missing
+# (the oldest databases, from the first plot point cog, have none of these)
+ADDED_COLUMNS = [
+    (Campaign, 'created_at'),
+    (Campaign, 'dm_id'),
+    (Campaign, 'version'),
+    (PlotPoint, 'potential_players'),
+    (PlotPoint, 'created_at'),
+    (PlotPoint, 'version'),
+    (Reminder, 'attempts'),
+]
+
+def create_schema(database=db):
+    """Create missing tables and add columns introduced since they were created"""
+    database.create_tables([Campaign, PlotPoint, Session, Reminder])
+
+    migrator = SqliteMigrator(database)
+    operations = []
+    for model, name in ADDED_COLUMNS:
+        columns = {column.name for column in database.get_columns(model._meta.table_name)}
+        if name not in columns:
+            operations.append(migrator.add_column(model._meta.table_name, name, getattr(model, name)))
+    if operations:
+        migrate(*operations)
 
 def init_db():
     """Initialize the database by creating all tables"""
     db.connect()
-    db.create_tables([Campaign, PlotPoint])
+    create_schema()
     print("Database initialized successfully")
-    db.close()
\ No newline at end of file
+    db.close()
@@ -33,10 +33,21 @@ class Campaign(BaseModel):
     plot_category_id = CharField(null=True)
     created_at = DateTimeField(default=datetime.now)
     dm_id = CharField(null=True)  # Store the Discord ID of the DM
+    version = IntegerField(default=1)  # Bumped when the campaign or any of its plot points change
 
     def __str__(self):
         return f"{self.name} (ID: {self.id})"
 
+    def save(self, *args, **kwargs):
+        if self.id is None:
+            return super().save(*args, **kwargs)
+        # Bump in SQL, not from this instance's copy, which may be stale
+        with self._meta.database.atomic():
+            self.version = Campaign.version + 1
+            result = super().save(*args, **kwargs)
+            self.version = Campaign.select(Campaign.version).where(Campaign.id == self.id).scalar()
+        return result
+
 
 class PlotPoint(BaseModel):
     campaign = ForeignKeyField(Campaign, backref='plot_points')
@@ -47,6 +58,42 @@ class PlotPoint(BaseModel):
     potential_players = TextField(null=True)
     channel_id = CharField(null=True)
     created_at = DateTimeField(default=datetime.now)
+    version = IntegerField(default=1)  # Bumped on every change, keys the cached embeds
 
     def __str__(self):
-        return f"{self.number}: {self.title} ({self.status})"
\ No newline at end of file
+        return f"{self.number}: {self.title} ({self.status})"
+
+    def save(self, *args, **kwargs):
+        with self._meta.database.atomic():
+            if self.id is None:
+                result = super().save(*args, **kwargs)
+            else:
+                # Bump in SQL, not from this instance's copy, which may be stale
+                self.version = PlotPoint.version + 1
+                result = super().save(*args, **kwargs)
+                self.version = PlotPoint.select(PlotPoint.version).where(PlotPoint.id == self.id).scalar()
+            # The campaign's plot point listing changed too
+            Campaign.update(version=Campaign.version + 1).where(Campaign.id == self.campaign_id).execute()
+        return result
+
+
+class Session(BaseModel):
+    plot_point = ForeignKeyField(PlotPoint, backref='sessions', on_delete='CASCADE')
+    starts_at = DateTimeField()
+    created_at = DateTimeField(default=datetime.now)
+
+
+class Reminder(BaseModel):
+    session = ForeignKeyField(Session, backref='reminders', on_delete='CASCADE')
+    kind = CharField()  # 'dm' or 'channel'
+    offset_minutes = IntegerField()
+    fire_at = DateTimeField()
+    status = CharField(default='Pending')  # Pending, Sent, Skipped, Failed
+    sent_at = DateTimeField(null=True)
+    attempts = IntegerField(default=0)  # Failed sends so far
+
+    class Meta:
+        # The scheduler only ever asks for the next pending reminders in time order
+        indexes = (
+            (('status', 'fire_at'), False),
+        )
@@ -0,0 +1,306 @@
+from datetime import datetime
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+from config.config import DATABASE_POOL_MAX_SIZE, DATABASE_POOL_MIN_SIZE, DATABASE_URL
+from .storage import (CAMPAIGN_FIELDS, EXPORT_TABLES, PLOT_POINT_FIELDS, REMINDER_FIELDS, CampaignRecord,
+                      PlotPointRecord, ReminderRecord, SessionRecord, Storage, _check_fields, _record)
+
+# Prepared statements cached per pooled connection. All queries below are
+# fixed strings (or a few field combinations for updates), so they stay hot.
+STATEMENT_CACHE_SIZE = 256
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS campaign (
+        id BIGSERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        plot_category_id TEXT,
+        created_at TIMESTAMP NOT NULL,
+        dm_id TEXT,
+        version INTEGER NOT NULL DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS plotpoint (
+        id BIGSERIAL PRIMARY KEY,
+        campaign_id BIGINT NOT NULL REFERENCES campaign (id),
+        number TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'Inactive',
+        potential_players TEXT,
+        channel_id TEXT,
+        created_at TIMESTAMP NOT NULL,
+        version INTEGER NOT NULL DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session (
+        id BIGSERIAL PRIMARY KEY,
+        plot_point_id BIGINT NOT NULL REFERENCES plotpoint (id) ON DELETE CASCADE,
+        starts_at TIMESTAMP NOT NULL,
+        created_at TIMESTAMP NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reminder (
+        id BIGSERIAL PRIMARY KEY,
+        session_id BIGINT NOT NULL REFERENCES session (id) ON DELETE CASCADE,
+        kind TEXT NOT NULL,
+        offset_minutes INTEGER NOT NULL,
+        fire_at TIMESTAMP NOT NULL,
+        status TEXT NOT NULL DEFAULT 'Pending',
+        sent_at TIMESTAMP,
+        attempts INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS plotpoint_campaign_id ON plotpoint (campaign_id)",
+    "CREATE INDEX IF NOT EXISTS campaign_dm_id ON campaign (dm_id)",
+    "CREATE INDEX IF NOT EXISTS session_plot_point_id ON session (plot_point_id)",
+    "CREATE INDEX IF NOT EXISTS reminder_session_id ON reminder (session_id)",
+    "CREATE INDEX IF NOT EXISTS reminder_status_fire_at ON reminder (status, fire_at)",
+]
+
+# Table and campaign column for each table export_rows can stream
+EXPORT_SOURCES = {
+    'campaign': ('campaign', 'id'),
+    'plot_point': ('plotpoint', 'campaign_id'),
+}
+
+
+class PostgresStorage(Storage):
+    """Storage on a shared PostgreSQL database through an asyncpg pool
+
+    Several bot processes can point at the same database. asyncpg prepares
+    each statement once per pooled connection and reuses it afterwards.
+    A pool (or anything with the same methods) can be passed in directly.
+    """
+
+    def __init__(self, dsn=DATABASE_URL, pool=None, min_size=DATABASE_POOL_MIN_SIZE,
+                 max_size=DATABASE_POOL_MAX_SIZE):
+        self.dsn = dsn
+        self.pool = pool
+        self.min_size = min_size
+        self.max_size = max_size
+
+    async def connect(self):
+        if self.pool is not None:
+            return
+        if asyncpg is None:
+            raise RuntimeError("The postgres storage backend needs asyncpg. Install it with `pip install asyncpg`.")
+        if not self.dsn:
+            raise ValueError("No PostgreSQL database configured. Set the DATABASE_URL environment variable.")
+        self.pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size,
+                                              statement_cache_size=STATEMENT_CACHE_SIZE)
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def create_schema(self):
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                for statement in SCHEMA:
+                    await connection.execute(statement)
+
+    async def create_campaign(self, name, dm_id=None):
+        row = await self.pool.fetchrow(
+            "INSERT INTO campaign (name, dm_id, created_at) VALUES ($1, $2, $3) RETURNING *",
+            name, dm_id, datetime.now()
+        )
+        return _record(CampaignRecord, row)
+
+    async def get_campaign(self, campaign_id):
+        row = await self.pool.fetchrow("SELECT * FROM campaign WHERE id = $1", campaign_id)
+        return _record(CampaignRecord, row) if row else None
+
+    async def list_campaigns_for_dm(self, dm_id):
+        rows = await self.pool.fetch(
+            "SELECT c.*, COUNT(p.id) AS plot_count FROM campaign c "
+            "LEFT JOIN plotpoint p ON p.campaign_id = c.id "
+            "WHERE c.dm_id = $1 GROUP BY c.id ORDER BY c.id",
+            dm_id
+        )
+        return [(_record(CampaignRecord, row), row['plot_count']) for row in rows]
+
+    @staticmethod
+    def _update_sql(table, changes):
+        # Column names come from the whitelist checked by _check_fields
+        assignments = ', '.join(f"{column} = ${position}" for position, column in enumerate(changes, start=1))
+        return (f"UPDATE {table} SET {assignments}, version = version + 1 "
+                f"WHERE id = ${len(changes) + 1} RETURNING *")
+
+    async def update_campaign(self, campaign_id, **changes):
+        _check_fields(changes, CAMPAIGN_FIELDS)
+        if changes:
+            await self.pool.execute(self._update_sql('campaign', changes), *changes.values(), campaign_id)
+
+    async def create_plot_point(self, campaign_id, number, title, description, status='Inactive'):
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                row = await connection.fetchrow(
+                    "INSERT INTO plotpoint (campaign_id, number, title, description, status, created_at) "
+                    "VALUES ($1, $2, $3, $4, $5, $6) RETURNING *",
+                    campaign_id, number, title, description, status, datetime.now()
+                )
+                await connection.execute("UPDATE campaign SET version = version + 1 WHERE id = $1", campaign_id)
+        return _record(PlotPointRecord, row)
+
+    async def get_plot_point(self, plot_id):
+        row = await self.pool.fetchrow("SELECT * FROM plotpoint WHERE id = $1", plot_id)
+        return _record(PlotPointRecord, row) if row else None
+
+    async def list_plot_points(self, campaign_id):
+        rows = await self.pool.fetch("SELECT * FROM plotpoint WHERE campaign_id = $1 ORDER BY number", campaign_id)
+        return [_record(PlotPointRecord, row) for row in rows]
+
+    async def update_plot_point(self, plot_id, **changes):
+        _check_fields(changes, PLOT_POINT_FIELDS)
+        if not changes:
+            return await self.get_plot_point(plot_id)
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                row = await connection.fetchrow(self._update_sql('plotpoint', changes), *changes.values(), plot_id)
+                if row:
+                    await connection.execute("UPDATE campaign SET version = version + 1 WHERE id = $1",
+                                             row['campaign_id'])
+        return _record(PlotPointRecord, row) if row else None
+
+    async def delete_plot_point(self, plot_id):
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                # The schema cascades, but deleting explicitly keeps this in step with SqliteStorage
+                await connection.execute(
+                    "DELETE FROM reminder WHERE session_id IN (SELECT id FROM session WHERE plot_point_id = $1)",
+                    plot_id)
+                await connection.execute("DELETE FROM session WHERE plot_point_id = $1", plot_id)
+                campaign_id = await connection.fetchval(
+                    "DELETE FROM plotpoint WHERE id = $1 RETURNING campaign_id", plot_id)
+                if campaign_id is not None:
+                    await connection.execute("UPDATE campaign SET version = version + 1 WHERE id = $1",
+                                             campaign_id)
+        return campaign_id is not None
+
+    async def campaign_keys(self):
+        rows = await self.pool.fetch("SELECT id, name, dm_id FROM campaign")
+        return [tuple(row.values()) for row in rows]
+
+    async def plot_point_keys(self):
+        rows = await self.pool.fetch("SELECT id, campaign_id, number, title FROM plotpoint")
+        return [tuple(row.values()) for row in rows]
+
+    async def referenced_channels(self):
+        campaigns = await self.pool.fetch(
+            "SELECT id, plot_category_id FROM campaign WHERE plot_category_id IS NOT NULL")
+        plot_points = await self.pool.fetch(
+            "SELECT id, status, channel_id FROM plotpoint WHERE channel_id IS NOT NULL")
+        return [tuple(row.values()) for row in campaigns], [tuple(row.values()) for row in plot_points]
+
+    async def clear_channel_references(self, campaign_categories=(), plot_channels=()):
+        # executemany pipelines one prepared statement over every pair
+        campaign_categories = [tuple(pair) for pair in campaign_categories]
+        plot_channels = [tuple(pair) for pair in plot_channels]
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                if campaign_categories:
+                    await connection.executemany(
+                        "UPDATE campaign SET plot_category_id = NULL, version = version + 1 "
+                        "WHERE id = $1 AND plot_category_id = $2",
+                        campaign_categories)
+                if plot_channels:
+                    # Campaigns first, while the plot points still hold the stale channel
+                    await connection.executemany(
+                        "UPDATE campaign SET version = version + 1 "
+                        "WHERE id = (SELECT campaign_id FROM plotpoint WHERE id = $1 AND channel_id = $2)",
+                        plot_channels)
+                    await connection.executemany(
+                        "UPDATE plotpoint SET channel_id = NULL, version = version + 1, "
+                        "status = CASE WHEN status = 'Active' THEN 'Inactive' ELSE status END "
+                        "WHERE id = $1 AND channel_id = $2",
+                        plot_channels)
+
+    async def latest_campaign(self):
+        row = await self.pool.fetchrow("SELECT * FROM campaign ORDER BY id DESC LIMIT 1")
+        return _record(CampaignRecord, row) if row else None
+
+    async def export_rows(self, table, campaign_id=None, since=None, chunk_size=500):
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        name, campaign_column = EXPORT_SOURCES[table]
+        # Keyset pages over the primary key; the optional filters are NULL when unused
+        sql = (f"SELECT * FROM {name} WHERE id > $1 "
+               f"AND ($2::BIGINT IS NULL OR {campaign_column} = $2) "
+               f"AND ($3::TIMESTAMP IS NULL OR created_at > $3) "
+               f"ORDER BY id LIMIT $4")
+
+        last_id = 0
+        while True:
+            rows = [dict(row) for row in await self.pool.fetch(sql, last_id, campaign_id, since, chunk_size)]
+            if not rows:
+                return
+            if table == 'plot_point':
+                # Same key the SQLite backend's peewee rows use
+                for row in rows:
+                    row['campaign'] = row.pop('campaign_id')
+            yield rows
+            last_id = rows[-1]['id']
+
+    async def create_session(self, plot_id, starts_at, reminders=()):
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                session = await connection.fetchrow(
+                    "INSERT INTO session (plot_point_id, starts_at, created_at) VALUES ($1, $2, $3) RETURNING *",
+                    plot_id, starts_at, datetime.now()
+                )
+                created = [
+                    await connection.fetchrow(
+                        "INSERT INTO reminder (session_id, kind, offset_minutes, fire_at) "
+                        "VALUES ($1, $2, $3, $4) RETURNING *",
+                        session['id'], kind, offset_minutes, fire_at
+                    )
+                    for kind, offset_minutes, fire_at in reminders
+                ]
+        return _record(SessionRecord, session), [_record(ReminderRecord, row) for row in created]
+
+    async def get_session(self, session_id):
+        row = await self.pool.fetchrow("SELECT * FROM session WHERE id = $1", session_id)
+        return _record(SessionRecord, row) if row else None
+
+    async def list_sessions(self, plot_id, after):
+        rows = await self.pool.fetch(
+            "SELECT * FROM session WHERE plot_point_id = $1 AND starts_at > $2 ORDER BY starts_at", plot_id, after)
+        return [_record(SessionRecord, row) for row in rows]
+
+    async def delete_session(self, session_id):
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                rows = await connection.fetch("DELETE FROM reminder WHERE session_id = $1 RETURNING id", session_id)
+                await connection.execute("DELETE FROM session WHERE id = $1", session_id)
+        return [row['id'] for row in rows]
+
+    async def pending_reminders(self, until):
+        rows = await self.pool.fetch(
+            "SELECT id, fire_at FROM reminder WHERE status = 'Pending' AND fire_at <= $1 ORDER BY fire_at", until)
+        return [tuple(row.values()) for row in rows]
+
+    async def get_reminder(self, reminder_id):
+        row = await self.pool.fetchrow("SELECT * FROM reminder WHERE id = $1", reminder_id)
+        return _record(ReminderRecord, row) if row else None
+
+    async def claim_reminder(self, reminder_id, now):
+        claimed = await self.pool.fetchval(
+            "UPDATE reminder SET status = 'Sent', sent_at = $2 WHERE id = $1 AND status = 'Pending' RETURNING id",
+            reminder_id, now)
+        return claimed is not None
+
+    async def update_reminder(self, reminder_id, **changes):
+        _check_fields(changes, REMINDER_FIELDS)
+        if changes:
+            assignments = ', '.join(f"{column} = ${position}" for position, column in enumerate(changes, start=1))
+            await self.pool.execute(f"UPDATE reminder SET {assignments} WHERE id = ${len(changes) + 1}",
+                                    *changes.values(), reminder_id)
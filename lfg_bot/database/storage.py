@@ -0,0 +1,432 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
+
+from peewee import JOIN, Case, Tuple, fn
+
+from config.config import STORAGE_BACKEND
+from . import create_schema, db
+from .models import Campaign, PlotPoint, Reminder, Session
+
+# Keep batched UPDATE ... WHERE (id, channel_id) IN (...) below SQLite's bound-variable limit
+UPDATE_BATCH_SIZE = 250
+
+CAMPAIGN_FIELDS = ('name', 'plot_category_id', 'dm_id')
+PLOT_POINT_FIELDS = ('number', 'title', 'description', 'status', 'potential_players', 'channel_id')
+REMINDER_FIELDS = ('fire_at', 'status', 'sent_at', 'attempts')
+
+# Tables export_rows can stream
+EXPORT_TABLES = ('campaign', 'plot_point')
+
+
+@dataclass
+class CampaignRecord:
+    id: int
+    name: str
+    plot_category_id: str = None
+    created_at: datetime = None
+    dm_id: str = None
+    version: int = 1
+
+    def __str__(self):
+        return f"{self.name} (ID: {self.id})"
+
+
+@dataclass
+class PlotPointRecord:
+    id: int
+    campaign_id: int
+    number: str
+    title: str
+    description: str
+    status: str = 'Inactive'
+    potential_players: str = None
+    channel_id: str = None
+    created_at: datetime = None
+    version: int = 1
+
+    def __str__(self):
+        return f"{self.number}: {self.title} ({self.status})"
+
+
+@dataclass
+class SessionRecord:
+    id: int
+    plot_point_id: int
+    starts_at: datetime
+    created_at: datetime = None
+
+
+@dataclass
+class ReminderRecord:
+    id: int
+    session_id: int
+    kind: str
+    offset_minutes: int
+    fire_at: datetime
+    status: str = 'Pending'
+    sent_at: datetime = None
+    attempts: int = 0
+
+
+def _record(record_class, row):
+    names = {f.name for f in fields(record_class)}
+    return record_class(**{key: value for key, value in row.items() if key in names})
+
+
+def _check_fields(changes, allowed):
+    unknown = set(changes) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+
+class Storage:
+    """Async interface the cogs use to read and write campaigns and plot points
+
+    Every backend returns CampaignRecord / PlotPointRecord objects and None
+    for rows that don't exist. Every write bumps the version of the rows it
+    touches, and any plot point change also bumps its campaign's version,
+    so cached renderings can be keyed by version.
+    """
+
+    async def connect(self):
+        raise NotImplementedError
+
+    async def close(self):
+        raise NotImplementedError
+
+    async def create_schema(self):
+        raise NotImplementedError
+
+    # Campaigns
+
+    async def create_campaign(self, name, dm_id=None):
+        raise NotImplementedError
+
+    async def get_campaign(self, campaign_id):
+        raise NotImplementedError
+
+    async def list_campaigns_for_dm(self, dm_id):
+        """Return (campaign, plot point count) pairs for one DM"""
+        raise NotImplementedError
+
+    async def update_campaign(self, campaign_id, **changes):
+        raise NotImplementedError
+
+    # Plot points
+
+    async def create_plot_point(self, campaign_id, number, title, description, status='Inactive'):
+        raise NotImplementedError
+
+    async def get_plot_point(self, plot_id):
+        raise NotImplementedError
+
+    async def list_plot_points(self, campaign_id):
+        """Return a campaign's plot points ordered by number"""
+        raise NotImplementedError
+
+    async def update_plot_point(self, plot_id, **changes):
+        """Apply changes and return the updated plot point"""
+        raise NotImplementedError
+
+    async def delete_plot_point(self, plot_id):
+        """Delete a plot point with its sessions and reminders, returning False if it didn't exist"""
+        raise NotImplementedError
+
+    # Bulk reads and writes for autocomplete and the reconciler
+
+    async def campaign_keys(self):
+        """Return (id, name, dm_id) for every campaign"""
+        raise NotImplementedError
+
+    async def plot_point_keys(self):
+        """Return (id, campaign_id, number, title) for every plot point"""
+        raise NotImplementedError
+
+    async def referenced_channels(self):
+        """Return ([(campaign_id, category_id)], [(plot_id, status, channel_id)]) for set ids"""
+        raise NotImplementedError
+
+    async def clear_channel_references(self, campaign_categories=(), plot_channels=()):
+        """In one transaction, clear stale campaign categories and plot point channels
+
+        Both take (id, stale id) pairs. A row is only changed while it still
+        holds the stale id, so a channel set since it was read is kept.
+        Plot points that are still Active are set back to Inactive.
+        """
+        raise NotImplementedError
+
+    async def latest_campaign(self):
+        """Return the most recently created campaign, or None if there are none"""
+        raise NotImplementedError
+
+    async def export_rows(self, table, campaign_id=None, since=None, chunk_size=500):
+        """Yield a table's rows as lists of plain dicts, chunk_size rows at a time in id order
+
+        table is 'campaign' or 'plot_point'. Rows are read a page at a time,
+        so memory use does not grow with the table. since limits the rows to
+        those created after that time.
+        """
+        raise NotImplementedError
+
+    # Sessions and reminders
+
+    async def create_session(self, plot_id, starts_at, reminders=()):
+        """Create a session and its reminders in one transaction
+
+        reminders are (kind, offset_minutes, fire_at) tuples. Returns the
+        session and the created ReminderRecords.
+        """
+        raise NotImplementedError
+
+    async def get_session(self, session_id):
+        raise NotImplementedError
+
+    async def list_sessions(self, plot_id, after):
+        """Return a plot point's sessions starting after the given time, soonest first"""
+        raise NotImplementedError
+
+    async def delete_session(self, session_id):
+        """Delete a session and its reminders, returning the deleted reminder ids"""
+        raise NotImplementedError
+
+    async def pending_reminders(self, until):
+        """Return (id, fire_at) for Pending reminders due by until, in fire_at order"""
+        raise NotImplementedError
+
+    async def get_reminder(self, reminder_id):
+        raise NotImplementedError
+
+    async def claim_reminder(self, reminder_id, now):
+        """Mark a Pending reminder Sent, returning False if it wasn't Pending any more
+
+        The conditional update is what keeps two schedulers, or one before
+        and after a restart, from sending the same reminder.
+        """
+        raise NotImplementedError
+
+    async def update_reminder(self, reminder_id, **changes):
+        raise NotImplementedError
+
+
+class SqliteStorage(Storage):
+    """Storage on the local SQLite file through the peewee models
+
+    Queries run on the event loop like the rest of the bot's peewee calls,
+    which is fine for a single process on local disk.
+    """
+
+    def __init__(self, database=db):
+        self.db = database
+
+    async def connect(self):
+        self.db.connect(reuse_if_open=True)
+
+    async def close(self):
+        if not self.db.is_closed():
+            self.db.close()
+
+    async def create_schema(self):
+        create_schema(self.db)
+
+    @staticmethod
+    def _bump_campaigns(campaign_ids):
+        return Campaign.update(version=Campaign.version + 1).where(Campaign.id.in_(campaign_ids)).execute()
+
+    @staticmethod
+    def _campaign(model):
+        return CampaignRecord(id=model.id, name=model.name, plot_category_id=model.plot_category_id,
+                              created_at=model.created_at, dm_id=model.dm_id, version=model.version)
+
+    @staticmethod
+    def _plot_point(model):
+        return PlotPointRecord(id=model.id, campaign_id=model.campaign_id, number=model.number,
+                               title=model.title, description=model.description, status=model.status,
+                               potential_players=model.potential_players, channel_id=model.channel_id,
+                               created_at=model.created_at, version=model.version)
+
+    async def create_campaign(self, name, dm_id=None):
+        return self._campaign(Campaign.create(name=name, dm_id=dm_id))
+
+    async def get_campaign(self, campaign_id):
+        campaign = Campaign.get_or_none(Campaign.id == campaign_id)
+        return self._campaign(campaign) if campaign else None
+
+    async def list_campaigns_for_dm(self, dm_id):
+        query = (Campaign
+                 .select(Campaign, fn.COUNT(PlotPoint.id).alias('plot_count'))
+                 .join(PlotPoint, JOIN.LEFT_OUTER)
+                 .where(Campaign.dm_id == dm_id)
+                 .group_by(Campaign.id)
+                 .order_by(Campaign.id))
+        return [(self._campaign(campaign), campaign.plot_count) for campaign in query]
+
+    async def update_campaign(self, campaign_id, **changes):
+        _check_fields(changes, CAMPAIGN_FIELDS)
+        Campaign.update(version=Campaign.version + 1, **changes).where(Campaign.id == campaign_id).execute()
+
+    async def create_plot_point(self, campaign_id, number, title, description, status='Inactive'):
+        # PlotPoint.save() bumps the campaign version
+        return self._plot_point(PlotPoint.create(campaign=campaign_id, number=number, title=title,
+                                                 description=description, status=status))
+
+    async def get_plot_point(self, plot_id):
+        plot_point = PlotPoint.get_or_none(PlotPoint.id == plot_id)
+        return self._plot_point(plot_point) if plot_point else None
+
+    async def list_plot_points(self, campaign_id):
+        query = PlotPoint.select().where(PlotPoint.campaign == campaign_id).order_by(PlotPoint.number)
+        return [self._plot_point(plot_point) for plot_point in query]
+
+    async def update_plot_point(self, plot_id, **changes):
+        _check_fields(changes, PLOT_POINT_FIELDS)
+        if changes:
+            with self.db.atomic():
+                PlotPoint.update(version=PlotPoint.version + 1, **changes).where(PlotPoint.id == plot_id).execute()
+                self._bump_campaigns(PlotPoint.select(PlotPoint.campaign).where(PlotPoint.id == plot_id))
+        return await self.get_plot_point(plot_id)
+
+    async def delete_plot_point(self, plot_id):
+        with self.db.atomic():
+            self._bump_campaigns(PlotPoint.select(PlotPoint.campaign).where(PlotPoint.id == plot_id))
+            # SQLite only cascades with PRAGMA foreign_keys on, which this connection doesn't set
+            sessions = Session.select(Session.id).where(Session.plot_point == plot_id)
+            Reminder.delete().where(Reminder.session.in_(sessions)).execute()
+            Session.delete().where(Session.plot_point == plot_id).execute()
+            return PlotPoint.delete().where(PlotPoint.id == plot_id).execute() > 0
+
+    async def campaign_keys(self):
+        return list(Campaign.select(Campaign.id, Campaign.name, Campaign.dm_id).tuples())
+
+    async def plot_point_keys(self):
+        return list(PlotPoint
+                    .select(PlotPoint.id, PlotPoint.campaign, PlotPoint.number, PlotPoint.title)
+                    .tuples())
+
+    async def referenced_channels(self):
+        campaigns = list(Campaign
+                         .select(Campaign.id, Campaign.plot_category_id)
+                         .where(Campaign.plot_category_id.is_null(False))
+                         .tuples())
+        plot_points = list(PlotPoint
+                           .select(PlotPoint.id, PlotPoint.status, PlotPoint.channel_id)
+                           .where(PlotPoint.channel_id.is_null(False))
+                           .tuples())
+        return campaigns, plot_points
+
+    async def clear_channel_references(self, campaign_categories=(), plot_channels=()):
+        def clear_categories(pairs):
+            return (Campaign.update(plot_category_id=None, version=Campaign.version + 1)
+                            .where(Tuple(Campaign.id, Campaign.plot_category_id).in_(pairs)))
+
+        def clear_plots(pairs):
+            stale = Tuple(PlotPoint.id, PlotPoint.channel_id).in_(pairs)
+            self._bump_campaigns(PlotPoint.select(PlotPoint.campaign).where(stale))
+            status = Case(None, [(PlotPoint.status == 'Active', 'Inactive')], PlotPoint.status)
+            return PlotPoint.update(status=status, channel_id=None, version=PlotPoint.version + 1).where(stale)
+
+        updates = [
+            (list(campaign_categories), clear_categories),
+            (list(plot_channels), clear_plots),
+        ]
+        with self.db.atomic():
+            for pairs, query_factory in updates:
+                for start in range(0, len(pairs), UPDATE_BATCH_SIZE):
+                    query_factory(pairs[start:start + UPDATE_BATCH_SIZE]).execute()
+
+
+    async def latest_campaign(self):
+        campaign = Campaign.select().order_by(Campaign.id.desc()).first()
+        return self._campaign(campaign) if campaign else None
+
+    async def export_rows(self, table, campaign_id=None, since=None, chunk_size=500):
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        model = Campaign if table == 'campaign' else PlotPoint
+        query = model.select().order_by(model.id).limit(chunk_size)
+        if campaign_id is not None:
+            query = query.where((Campaign.id if model is Campaign else PlotPoint.campaign) == campaign_id)
+        if since is not None:
+            query = query.where(model.created_at > since)
+
+        # Keyset pages, so each one is a short indexed query
+        last_id = 0
+        while True:
+            rows = list(query.where(model.id > last_id).dicts())
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]['id']
+
+    @staticmethod
+    def _session(model):
+        return SessionRecord(id=model.id, plot_point_id=model.plot_point_id, starts_at=model.starts_at,
+                             created_at=model.created_at)
+
+    @staticmethod
+    def _reminder(model):
+        return ReminderRecord(id=model.id, session_id=model.session_id, kind=model.kind,
+                              offset_minutes=model.offset_minutes, fire_at=model.fire_at, status=model.status,
+                              sent_at=model.sent_at, attempts=model.attempts)
+
+    async def create_session(self, plot_id, starts_at, reminders=()):
+        with self.db.atomic():
+            session = Session.create(plot_point=plot_id, starts_at=starts_at)
+            created = [Reminder.create(session=session, kind=kind, offset_minutes=offset_minutes, fire_at=fire_at)
+                       for kind, offset_minutes, fire_at in reminders]
+        return self._session(session), [self._reminder(reminder) for reminder in created]
+
+    async def get_session(self, session_id):
+        session = Session.get_or_none(Session.id == session_id)
+        return self._session(session) if session else None
+
+    async def list_sessions(self, plot_id, after):
+        query = (Session
+                 .select()
+                 .where((Session.plot_point == plot_id) & (Session.starts_at > after))
+                 .order_by(Session.starts_at))
+        return [self._session(session) for session in query]
+
+    async def delete_session(self, session_id):
+        with self.db.atomic():
+            reminder_ids = [reminder_id for reminder_id, in
+                            Reminder.select(Reminder.id).where(Reminder.session == session_id).tuples()]
+            Reminder.delete().where(Reminder.session == session_id).execute()
+            Session.delete().where(Session.id == session_id).execute()
+        return reminder_ids
+
+    async def pending_reminders(self, until):
+        return list(Reminder
+                    .select(Reminder.id, Reminder.fire_at)
+                    .where((Reminder.status == 'Pending') & (Reminder.fire_at <= until))
+                    .order_by(Reminder.fire_at)
+                    .tuples())
+
+    async def get_reminder(self, reminder_id):
+        reminder = Reminder.get_or_none(Reminder.id == reminder_id)
+        return self._reminder(reminder) if reminder else None
+
+    async def claim_reminder(self, reminder_id, now):
+        return Reminder.update(status='Sent', sent_at=now).where(
+            (Reminder.id == reminder_id) & (Reminder.status == 'Pending')).execute() > 0
+
+    async def update_reminder(self, reminder_id, **changes):
+        _check_fields(changes, REMINDER_FIELDS)
+        if changes:
+            Reminder.update(**changes).where(Reminder.id == reminder_id).execute()
+
+
+_storage = None
+
+
+def get_storage():
+    """Return the process-wide storage backend chosen by STORAGE_BACKEND"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == 'sqlite':
+            _storage = SqliteStorage()
+        elif STORAGE_BACKEND == 'postgres':
+            from .postgres import PostgresStorage
+            _storage = PostgresStorage()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return _storage
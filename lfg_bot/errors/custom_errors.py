@@ -0,0 +1,17 @@
+from discord.ext import commands
+
+
+class RateLimited(commands.CheckFailure):
+    """Raised when a user, guild or command has run out of command tokens"""
+
+    def __init__(self, scope, retry_after):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(f"Rate limited ({scope}), retry in {retry_after:.1f}s")
+
+
+class ShuttingDown(commands.CheckFailure):
+    """Raised for commands that arrive after the bot has started shutting down"""
+
+    def __init__(self):
+        super().__init__("The bot is shutting down")
@@ -0,0 +1,221 @@
+"""Export and backup tools for the campaign database
+
+Exports read through the configured storage backend, so they work on
+SQLite and PostgreSQL alike. Backups use the SQLite backup API and only
+apply to the SQLite backend; back up PostgreSQL with pg_dump.
+
+Usage:
+    python -m lfg_bot.export export campaigns.jsonl.gz
+    python -m lfg_bot.export export exports/ --format parquet --campaign 3
+    python -m lfg_bot.export export campaigns.jsonl.gz --watermark-file export.watermark
+    python -m lfg_bot.export backup backups/campaigns_plotpoints.db
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from config.config import STORAGE_BACKEND
+from lfg_bot.database import db
+from lfg_bot.database.storage import get_storage
+
+CHUNK_SIZE = 500
+
+# Pages copied per backup step; writers can get the lock between steps
+BACKUP_PAGES_PER_STEP = 256
+
+
+def _serialize(row):
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def _parquet_schemas(pa):
+    # Spelled out rather than inferred, since a chunk where a column is all
+    # NULL would otherwise give it the null type and later chunks fail to cast
+    return {
+        'campaign': pa.schema([
+            ('id', pa.int64()),
+            ('name', pa.string()),
+            ('plot_category_id', pa.string()),
+            ('created_at', pa.timestamp('us')),
+            ('dm_id', pa.string()),
+            ('version', pa.int64()),
+        ]),
+        'plot_point': pa.schema([
+            ('id', pa.int64()),
+            ('campaign', pa.int64()),
+            ('number', pa.string()),
+            ('title', pa.string()),
+            ('description', pa.string()),
+            ('status', pa.string()),
+            ('potential_players', pa.string()),
+            ('channel_id', pa.string()),
+            ('created_at', pa.timestamp('us')),
+            ('version', pa.int64()),
+        ]),
+    }
+
+
+class ExportResult:
+    def __init__(self):
+        self.counts = {'campaign': 0, 'plot_point': 0}
+        self.watermark = None
+        self.paths = []
+
+    def track(self, table, chunk):
+        self.counts[table] += len(chunk)
+        for row in chunk:
+            created_at = row.get('created_at')
+            if created_at is None:
+                continue
+            if self.watermark is None or created_at > self.watermark:
+                self.watermark = created_at
+
+
+async def _export_jsonl(path, chunks, result):
+    with gzip.open(path, 'wt', encoding='utf-8') as out:
+        async for table, chunk in chunks:
+            lines = ''.join(json.dumps({'table': table, **_serialize(row)}) + '\n' for row in chunk)
+            # Compress off the event loop so a large export doesn't stall the bot
+            await asyncio.to_thread(out.write, lines)
+            result.track(table, chunk)
+    result.paths.append(path)
+
+
+async def _export_parquet(directory, chunks, result):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow. Install it with `pip install pyarrow`.")
+
+    os.makedirs(directory, exist_ok=True)
+    schemas = _parquet_schemas(pa)
+    writers = {}
+    try:
+        async for table, chunk in chunks:
+            if table not in writers:
+                path = os.path.join(directory, f"{table}.parquet")
+                writers[table] = pq.ParquetWriter(path, schemas[table], compression='zstd')
+                result.paths.append(path)
+            batch = pa.Table.from_pylist(chunk, schema=schemas[table])
+            await asyncio.to_thread(writers[table].write_table, batch)
+            result.track(table, chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+
+async def export_campaigns(storage, path, fmt='jsonl', campaign_id=None, since=None, chunk_size=CHUNK_SIZE):
+    """Stream campaigns and plot points to gzipped JSONL or Parquet files
+
+    Rows are read from storage a page at a time, so memory use does not
+    grow with the size of the database. For Parquet, path is a directory
+    that gets one file per table. since limits the export to rows created
+    after that time.
+    """
+    async def chunks():
+        for table in ('campaign', 'plot_point'):
+            # An empty first page still yields, so every table gets a Parquet file with its schema
+            empty = True
+            async for chunk in storage.export_rows(table, campaign_id, since, chunk_size):
+                empty = False
+                yield table, chunk
+            if empty:
+                yield table, []
+
+    result = ExportResult()
+    if fmt == 'jsonl':
+        await _export_jsonl(path, chunks(), result)
+    elif fmt == 'parquet':
+        await _export_parquet(path, chunks(), result)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return result
+
+
+def read_watermark(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        value = f.read().strip()
+    return datetime.fromisoformat(value) if value else None
+
+
+def write_watermark(path, watermark):
+    with open(path, 'w') as f:
+        f.write(watermark.isoformat())
+
+
+def backup_database(source_path, destination_path, pages=BACKUP_PAGES_PER_STEP):
+    """Take a consistent online snapshot using the SQLite backup API
+
+    Uses its own connections and copies a few pages per step, so the bot
+    can keep writing while the backup runs.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(destination_path)), exist_ok=True)
+    source = sqlite3.connect(source_path)
+    destination = sqlite3.connect(destination_path)
+    try:
+        with destination:
+            source.backup(destination, pages=pages, sleep=0.01)
+    finally:
+        destination.close()
+        source.close()
+    return destination_path
+
+
+async def _export(args, since):
+    storage = get_storage()
+    await storage.connect()
+    try:
+        return await export_campaigns(storage, args.output, args.format, args.campaign, since, args.chunk_size)
+    finally:
+        await storage.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or back up the VentureVault campaign database")
+    parser.add_argument('--database', default=db.database, help="SQLite database file (default: %(default)s)")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subcommands.add_parser('export', help="Stream campaigns and plot points to a file")
+    export_parser.add_argument('output', help="Output .jsonl.gz file, or directory for parquet")
+    export_parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    export_parser.add_argument('--campaign', type=int, help="Only export this campaign")
+    export_parser.add_argument('--since', type=datetime.fromisoformat, help="Only rows created after this time")
+    export_parser.add_argument('--watermark-file',
+                               help="Incremental mode: export rows newer than the stored watermark, then update it")
+    export_parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    backup_parser = subcommands.add_parser('backup', help="Take an online snapshot of the database")
+    backup_parser.add_argument('output', help="Destination database file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'backup':
+        if STORAGE_BACKEND != 'sqlite':
+            parser.error("backup only works with the SQLite backend, use pg_dump for PostgreSQL")
+        backup_database(args.database, args.output)
+        print(f"Backed up {args.database} to {args.output}")
+        return
+
+    # Only used by the SQLite backend; PostgreSQL reads DATABASE_URL
+    db.init(args.database)
+    since = args.since
+    if args.watermark_file and since is None:
+        since = read_watermark(args.watermark_file)
+
+    result = asyncio.run(_export(args, since))
+    if args.watermark_file and result.watermark:
+        write_watermark(args.watermark_file, result.watermark)
+
+    print(f"Exported {result.counts['campaign']} campaigns and {result.counts['plot_point']} plot points "
+          f"to {', '.join(result.paths)}")
+
+
+if __name__ == '__main__':
+    main()
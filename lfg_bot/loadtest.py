@@ -0,0 +1,581 @@
+"""Load test: drive VentureVaultBot with synthetic gateway and HTTP traffic
+
+Guilds, members, messages and button clicks are fed into the bot's
+connection state as gateway events, and every REST call (interaction
+responses included) is answered by an in-memory fake of Discord's API
+after a simulated network delay. Virtual users are ramped up stage by
+stage; each one clicks its plot point's Activate/Deactivate buttons, runs
+/list_plot_points and sends !list_campaigns, waiting for the reply before
+the next action. The report shows where throughput stops growing and how
+many interactions miss Discord's 3 second response window. Replies that
+did no work, a click turned away because another one holds the plot
+point's lease, are counted separately and left out of both.
+
+The rate limits, the coalescing of repeated listings and the cogs with
+background tasks (the channel reconciler and the session reminder
+scheduler) are turned off before the first stage, so they neither answer
+the virtual users without doing the work nor add REST calls and database
+writes of their own to the numbers; keep them with --keep-rate-limits,
+--keep-coalescing and --keep-background-tasks.
+
+Run from the repository root, against a throwaway database:
+    python -m lfg_bot.loadtest
+    python -m lfg_bot.loadtest --stages 1,10,25,50,100 --stage-seconds 20 --http-latency 0.1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import discord
+
+from lfg_bot.cogs.lfg import PlotPointManagementView
+from lfg_bot.database import create_schema, db
+from lfg_bot.database.models import Campaign, PlotPoint
+from lfg_bot.utils.diagnostics import get_loop_monitor, percentile
+from lfg_bot.utils.embeds import plot_point_embed
+
+# Discord fails an interaction that isn't answered within this many seconds
+INTERACTION_WINDOW_SECONDS = 3
+
+# A virtual user gives up waiting for a reply after this long
+REPLY_TIMEOUT_SECONDS = 15
+
+LAG_SAMPLE_SECONDS = 0.05
+
+ACTIONS = {'click': 3, 'slash': 2, 'prefix': 1}
+
+# Extensions whose background tasks run on their own schedule, not the virtual users'
+BACKGROUND_EXTENSIONS = ('lfg_bot.cogs.reconciler', 'lfg_bot.cogs.sessions')
+
+# Replies that answer a request without doing its work
+BUSY_REPLY = "This plot point is being updated"
+COALESCED_REPLY = "👆"
+
+APPLICATION_ID = 900000000000000001
+BOT_USER_ID = 900000000000000002
+ALL_PERMISSIONS = str((1 << 53) - 1)
+
+_last_snowflake = 0
+
+
+def _snowflake():
+    # Real timestamps, since discord.py checks interaction ids for expiry
+    global _last_snowflake
+    _last_snowflake = max(_last_snowflake + 1, discord.utils.time_snowflake(datetime.now(timezone.utc)))
+    return _last_snowflake
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _user(user_id, name, bot=False):
+    return {'id': str(user_id), 'username': name, 'global_name': name, 'discriminator': '0', 'avatar': None,
+            'bot': bot}
+
+
+def _member(user):
+    return {'user': user, 'roles': [], 'joined_at': _now(), 'deaf': False, 'mute': False, 'flags': 0,
+            'permissions': ALL_PERMISSIONS}
+
+
+def _channel(guild_id, name, channel_type=0, parent_id=None):
+    return {'id': str(_snowflake()), 'guild_id': str(guild_id), 'name': name, 'type': channel_type,
+            'position': 0, 'permission_overwrites': [], 'parent_id': str(parent_id) if parent_id else None,
+            'nsfw': False, 'topic': None, 'rate_limit_per_user': 0, 'last_message_id': None}
+
+
+def _message(channel_id, author, content='', embeds=(), components=(), message_id=None):
+    return {'id': str(message_id or _snowflake()), 'channel_id': str(channel_id), 'author': author,
+            'content': content, 'timestamp': _now(), 'edited_timestamp': None, 'tts': False,
+            'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [],
+            'embeds': list(embeds), 'components': list(components), 'pinned': False, 'type': 0, 'flags': 0}
+
+
+class Probe:
+    """Timestamps of one synthetic request and the bot's answers to it"""
+
+    def __init__(self, action):
+        self.action = action
+        self.started = time.perf_counter()
+        self.acked = None
+        self.replied = None
+        self.outcome = None  # 'busy' or 'coalesced' when the reply did no work
+        self.done = asyncio.Event()
+
+    @property
+    def did_work(self):
+        return self.replied is not None and self.outcome is None
+
+    def ack(self):
+        if self.acked is None:
+            self.acked = time.perf_counter()
+
+    def reply(self, content=''):
+        self.ack()
+        if self.replied is None:
+            self.replied = time.perf_counter()
+            if content.startswith(BUSY_REPLY):
+                self.outcome = 'busy'
+            elif content.startswith(COALESCED_REPLY):
+                self.outcome = 'coalesced'
+            self.done.set()
+
+
+class NoCoalescing:
+    """Stand-in for RequestCoalescer that runs every request"""
+
+    def invalidate(self):
+        pass
+
+    async def run(self, key, work):
+        return await work(), True
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.reason = 'OK'
+        self.headers = {'content-type': 'application/json'}
+        self._body = body
+
+    async def text(self, encoding=None):
+        return json.dumps(self._body)
+
+
+class FakeDiscord:
+    """In-memory stand-in for Discord's REST API, used as the bot's aiohttp session
+
+    Answers the routes the cogs use, remembers the embeds and components
+    each message was last edited to (so clicks see the current buttons), and
+    feeds channel creates and deletes back through the gateway like
+    Discord does. Probes are completed only once the simulated round trip
+    is over, when the bot gets the response back, not when the request
+    leaves it.
+    """
+
+    closed = False
+
+    def __init__(self, state, bot_user, latency):
+        self.state = state
+        self.bot_user = bot_user
+        self.latency = latency
+        self.calls = Counter()
+        self.channels = {}
+        self.messages = {}
+        self.probes = {}
+        self._interaction_channels = {}
+        self.routes = [
+            ('POST', r'/interactions/(\d+)/[^/]+/callback', self._interaction_callback),
+            ('POST', r'/webhooks/\d+/token-(\d+)', self._followup),
+            ('PATCH', r'/webhooks/\d+/token-(\d+)/messages/[^/]+', self._followup),
+            ('GET', r'/webhooks/\d+/token-(\d+)/messages/[^/]+', self._original_response),
+            ('POST', r'/channels/(\d+)/messages', self._create_message),
+            ('PATCH', r'/channels/(\d+)/messages/(\d+)', self._edit_message),
+            ('PUT', r'/channels/(\d+)/messages/\d+/reactions/.+', self._add_reaction),
+            ('GET', r'/guilds/(\d+)/channels', self._guild_channels),
+            ('POST', r'/guilds/(\d+)/channels', self._create_channel),
+            ('DELETE', r'/channels/(\d+)', self._delete_channel),
+            ('PUT', r'/applications/\d+(?:/guilds/\d+)?/commands', lambda body, completions: []),
+        ]
+
+    def expect(self, key, action):
+        probe = self.probes[key] = Probe(action)
+        return probe
+
+    def track_interaction(self, interaction_id, channel_id):
+        self._interaction_channels[interaction_id] = channel_id
+
+    @asynccontextmanager
+    async def request(self, method, url, data=None, **kwargs):
+        path = urlsplit(url).path.split('/api/v10', 1)[-1]
+        body = json.loads(data) if isinstance(data, str) else {}
+        completions = []
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                self.calls[f"{method} {pattern}"] += 1
+                result = handler(*match.groups(), body, completions)
+                break
+        else:
+            self.calls[f"{method} (unhandled)"] += 1
+            result = {}
+        await asyncio.sleep(self.latency)
+        for complete in completions:
+            complete()
+        yield FakeResponse(200, result)
+
+    async def close(self):
+        pass
+
+    def _interaction_callback(self, interaction_id, body, completions):
+        probe = self.probes.get(('interaction', interaction_id))
+        if probe:
+            # 5 and 6 are deferrals, anything else answers the user
+            if body.get('type') in (5, 6):
+                completions.append(probe.ack)
+            else:
+                content = (body.get('data') or {}).get('content') or ''
+                completions.append(lambda: probe.reply(content))
+        return {'interaction': {'id': interaction_id, 'type': 2}}
+
+    def _followup(self, interaction_id, body, completions):
+        probe = self.probes.get(('interaction', interaction_id))
+        if probe:
+            completions.append(lambda: probe.reply(body.get('content') or ''))
+        channel_id = self._interaction_channels.get(interaction_id, 0)
+        return _message(channel_id, self.bot_user, body.get('content') or '', body.get('embeds') or ())
+
+    def _original_response(self, interaction_id, body, completions):
+        return _message(self._interaction_channels.get(interaction_id, 0), self.bot_user)
+
+    def _create_message(self, channel_id, body, completions):
+        probe = self.probes.get(('channel', channel_id))
+        if probe:
+            completions.append(lambda: probe.reply(body.get('content') or ''))
+        return _message(channel_id, self.bot_user, body.get('content') or '', body.get('embeds') or (),
+                        body.get('components') or ())
+
+    def _edit_message(self, channel_id, message_id, body, completions):
+        message = self.messages.setdefault(message_id, {})
+        message.update({key: body[key] for key in ('embeds', 'components') if key in body})
+        return _message(channel_id, self.bot_user, body.get('content') or '', body.get('embeds') or (),
+                        body.get('components') or (), message_id=message_id)
+
+    def _add_reaction(self, channel_id, body, completions):
+        probe = self.probes.get(('channel', channel_id))
+        if probe:
+            # The coalescer's answer to a repeated prefix listing
+            completions.append(lambda: probe.reply(COALESCED_REPLY))
+        return {}
+
+    def _guild_channels(self, guild_id, body, completions):
+        return [channel for channel in self.channels.values() if channel['guild_id'] == guild_id]
+
+    def _create_channel(self, guild_id, body, completions):
+        channel = _channel(guild_id, body['name'], body.get('type', 0), body.get('parent_id'))
+        self.channels[channel['id']] = channel
+        self.state.loop.call_soon(self.state.parse_channel_create, channel)
+        return channel
+
+    def _delete_channel(self, channel_id, body, completions):
+        channel = self.channels.pop(channel_id, None)
+        if channel:
+            self.state.loop.call_soon(self.state.parse_channel_delete, channel)
+        return channel or {}
+
+
+class VirtualUser:
+    """A member with their own channel and plot point overview message"""
+
+    def __init__(self, index, guild, campaign, overview):
+        self.user = _user(100000 + index, f"loadtest-{index}")
+        self.guild_id = int(guild['id'])
+        self.campaign = campaign
+        self.overview = overview
+        self.channel = _channel(guild['id'], f"loadtest-{index}")
+        self.plot_point = PlotPoint.create(campaign=campaign, number=f"{index + 1:02d}", title=f"Plot {index}",
+                                           description="Load test plot point")
+        self.message_id = str(_snowflake())
+
+
+class StageResult:
+    def __init__(self, users, seconds):
+        self.users = users
+        self.seconds = seconds
+        self.probes = []
+        self.lag = []
+
+    def latencies(self, attribute, action=None):
+        return [getattr(probe, attribute) - probe.started for probe in self.probes
+                if probe.did_work and action in (None, probe.action)]
+
+    @property
+    def throughput(self):
+        """Requests per second that got a reply after doing their work"""
+        return len([probe for probe in self.probes if probe.did_work]) / self.seconds
+
+    def count(self, outcome):
+        return len([probe for probe in self.probes if probe.outcome == outcome])
+
+    @property
+    def timeouts(self):
+        return len([probe for probe in self.probes if probe.replied is None])
+
+    @property
+    def missed_window(self):
+        """Share of interactions not acknowledged within the interaction window"""
+        interactions = [probe for probe in self.probes if probe.action != 'prefix' and probe.outcome is None]
+        late = [probe for probe in interactions
+                if probe.acked is None or probe.acked - probe.started > INTERACTION_WINDOW_SECONDS]
+        return len(late) / len(interactions) if interactions else 0.0
+
+
+class LoadTest:
+    def __init__(self, bot, guilds, campaigns, http_latency, keep_rate_limits=False,
+                 keep_background_tasks=False, keep_coalescing=False, seed=0):
+        self.bot = bot
+        self.guild_count = guilds
+        self.campaign_count = campaigns
+        self.http_latency = http_latency
+        self.keep_rate_limits = keep_rate_limits
+        self.keep_background_tasks = keep_background_tasks
+        self.keep_coalescing = keep_coalescing
+        self.random = random.Random(seed)
+        self.users = []
+        self.fake = None
+
+    async def start(self, max_users):
+        """Connect the bot to the fake Discord and seed guilds, campaigns and plot points"""
+        state = self.bot._connection
+        bot_user = _user(BOT_USER_ID, 'VentureVault', bot=True)
+        self.fake = FakeDiscord(state, bot_user, self.http_latency)
+        # What HTTPClient.static_login sets up, with the fake in place of the aiohttp session.
+        # REST calls and interaction responses both go through that session.
+        self.bot.http._HTTPClient__session = self.fake
+        self.bot.http._global_over = asyncio.Event()
+        self.bot.http._global_over.set()
+
+        await self.bot.setup_hook()
+        if not self.keep_rate_limits and 'lfg_bot.cogs.rate_limits' in self.bot.extensions:
+            await self.bot.unload_extension('lfg_bot.cogs.rate_limits')
+        if not self.keep_background_tasks:
+            for extension in BACKGROUND_EXTENSIONS:
+                if extension in self.bot.extensions:
+                    await self.bot.unload_extension(extension)
+        plot_points = self.bot.get_cog('PlotPointCog')
+        if not self.keep_coalescing and plot_points:
+            plot_points.coalescer = NoCoalescing()
+
+        guilds = [{'id': str(_snowflake()), 'name': f"Load Test {n}", 'owner_id': str(BOT_USER_ID),
+                   'channels': [], 'members': [_member(bot_user)], 'roles': [], 'emojis': [], 'stickers': [],
+                   'features': [], 'threads': [], 'presences': [], 'voice_states': [], 'member_count': 1,
+                   'large': False, 'unavailable': False, 'joined_at': _now()}
+                  for n in range(self.guild_count)]
+        for guild in guilds:
+            guild['roles'].append({'id': guild['id'], 'name': '@everyone', 'permissions': ALL_PERMISSIONS,
+                                   'position': 0, 'color': 0, 'hoist': False, 'managed': False,
+                                   'mentionable': False})
+
+        campaigns = []
+        for n in range(self.campaign_count):
+            guild = guilds[n % len(guilds)]
+            category = _channel(guild['id'], f"Campaign {n} Plot Points", channel_type=4)
+            overview = _channel(guild['id'], "plot-overview", parent_id=category['id'])
+            guild['channels'] += [category, overview]
+            campaign = Campaign.create(name=f"Campaign {n}", dm_id=str(100000 + n),
+                                       plot_category_id=category['id'])
+            campaigns.append((guild, campaign, overview))
+
+        for index in range(max_users):
+            guild, campaign, overview = campaigns[index % len(campaigns)]
+            vu = VirtualUser(index, guild, campaign, overview)
+            guild['channels'].append(vu.channel)
+            guild['members'].append(_member(vu.user))
+            self.users.append(vu)
+
+        for guild in guilds:
+            self.fake.channels.update({channel['id']: channel for channel in guild['channels']})
+            guild['member_count'] = len(guild['members'])
+
+        state.parse_ready({'v': 10, 'user': bot_user, 'session_id': 'loadtest', 'resume_gateway_url': '',
+                           'guilds': [{'id': guild['id'], 'unavailable': True} for guild in guilds],
+                           'application': {'id': str(APPLICATION_ID), 'flags': 0}})
+        for guild in guilds:
+            state.parse_guild_create(guild)
+        await self.bot.wait_until_ready()
+
+        # The overview messages the management buttons belong to
+        for vu in self.users:
+            view = PlotPointManagementView(vu.plot_point, self.bot)
+            state.store_view(view, int(vu.message_id))
+            self.fake.messages[vu.message_id] = {'embeds': [plot_point_embed(vu.plot_point).to_dict()],
+                                                 'components': view.to_components()}
+
+    def _interaction(self, vu, interaction_type, data, message=None):
+        interaction_id = str(_snowflake())
+        payload = {'id': interaction_id, 'application_id': str(APPLICATION_ID), 'type': interaction_type,
+                   'token': f"token-{interaction_id}", 'version': 1, 'guild_id': str(vu.guild_id),
+                   'channel_id': vu.channel['id'], 'channel': vu.channel, 'member': _member(vu.user),
+                   'data': data, 'locale': 'en-US', 'guild_locale': 'en-US', 'app_permissions': ALL_PERMISSIONS,
+                   'entitlements': [], 'authorizing_integration_owners': {}, 'context': 0,
+                   'attachment_size_limit': 8 * 1024 * 1024}
+        if message:
+            payload['message'] = message
+        self.fake.track_interaction(interaction_id, vu.channel['id'])
+        return interaction_id, payload
+
+    def _click(self, vu):
+        # Press whichever of Activate/Deactivate the message currently has enabled
+        current = self.fake.messages[vu.message_id]
+        buttons = [button for row in current['components'] for button in row['components']
+                   if button.get('label') in ('Activate', 'Deactivate') and not button.get('disabled')]
+        if not buttons:
+            return None
+        message = _message(vu.overview['id'], self.fake.bot_user, embeds=current['embeds'],
+                           components=current['components'], message_id=vu.message_id)
+        message['guild_id'] = str(vu.guild_id)
+        interaction_id, payload = self._interaction(
+            vu, 3, {'custom_id': buttons[0]['custom_id'], 'component_type': 2}, message)
+        return ('interaction', interaction_id), payload, self.bot._connection.parse_interaction_create
+
+    def _slash(self, vu):
+        interaction_id, payload = self._interaction(vu, 2, {
+            'id': str(_snowflake()), 'name': 'list_plot_points', 'type': 1,
+            'options': [{'name': 'campaign_id', 'type': 4, 'value': vu.campaign.id}]})
+        return ('interaction', interaction_id), payload, self.bot._connection.parse_interaction_create
+
+    def _prefix(self, vu):
+        message = _message(vu.channel['id'], vu.user, content='!list_campaigns')
+        message.update(guild_id=str(vu.guild_id), member=_member(vu.user))
+        return ('channel', vu.channel['id']), message, self.bot._connection.parse_message_create
+
+    async def _act(self, vu, action):
+        request = {'click': self._click, 'slash': self._slash, 'prefix': self._prefix}[action](vu)
+        if request is None:
+            return None
+        key, payload, dispatch = request
+        probe = self.fake.expect(key, action)
+        dispatch(payload)
+        try:
+            await asyncio.wait_for(probe.done.wait(), REPLY_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        self.fake.probes.pop(key, None)
+        return probe
+
+    async def _run_user(self, vu, result, deadline):
+        actions, weights = list(ACTIONS), list(ACTIONS.values())
+        while time.perf_counter() < deadline:
+            probe = await self._act(vu, self.random.choices(actions, weights)[0])
+            if probe:
+                result.probes.append(probe)
+
+    async def _sample_lag(self, result):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_SAMPLE_SECONDS)
+            result.lag.append(loop.time() - started - LAG_SAMPLE_SECONDS)
+
+    async def run_stage(self, users, seconds):
+        result = StageResult(users, seconds)
+        sampler = asyncio.create_task(self._sample_lag(result))
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(self._run_user(vu, result, deadline) for vu in self.users[:users]))
+        sampler.cancel()
+        return result
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def format_report(results, calls):
+    lines = [f"{'users':>6} {'ops/s':>7} {'ack p50':>8} {'ack p95':>8} {'ack p99':>8} {'reply p95':>9} "
+             f"{'>3s':>6} {'timeouts':>8} {'busy':>6} {'shared':>6} {'lag p99':>8} {'lag max':>8}"
+             f"   (latencies in ms)"]
+    for result in results:
+        acks = result.latencies('acked')
+        lines.append(
+            f"{result.users:>6} {result.throughput:>7.1f} {_ms(percentile(acks, 50)):>8} "
+            f"{_ms(percentile(acks, 95)):>8} {_ms(percentile(acks, 99)):>8} "
+            f"{_ms(percentile(result.latencies('replied'), 95)):>9} {result.missed_window:>6.1%} "
+            f"{result.timeouts:>8} {result.count('busy'):>6} {result.count('coalesced'):>6} "
+            f"{_ms(percentile(result.lag, 99)):>8} {_ms(max(result.lag, default=None)):>8}")
+
+    lines.append("")
+    lines.append("p95 reply latency by action (ms): " + ", ".join(
+        f"{action} {_ms(percentile(results[-1].latencies('replied', action), 95))}" for action in ACTIONS)
+        + f" at {results[-1].users} users")
+
+    lines.append("ops/s, latencies and >3s only count replies that did the work; busy clicks found the plot "
+                 "point's lease taken and shared listings were answered by the coalescer.")
+    peak = max(results, key=lambda result: result.throughput)
+    lines.append(f"Throughput peaked at {peak.throughput:.1f} ops/s with {peak.users} users.")
+    failing = next((result for result in results if result.missed_window > 0.01), None)
+    if failing:
+        lines.append(f"From {failing.users} users, {failing.missed_window:.1%} of interactions missed the "
+                     f"{INTERACTION_WINDOW_SECONDS}s window.")
+    else:
+        lines.append(f"No stage missed the {INTERACTION_WINDOW_SECONDS}s interaction window; ramp further "
+                     f"to find the saturation point.")
+
+    monitor = get_loop_monitor()
+    if monitor.slow_callbacks:
+        lines.append("")
+        lines.append(f"Slow callbacks (over {monitor.threshold * 1000:.0f} ms): {monitor.blocked_count}, "
+                     f"most often at:")
+        locations = Counter(slow.location for slow in monitor.slow_callbacks)
+        lines += [f"  {count:>7}  {location}" for location, count in locations.most_common(5)]
+
+    lines.append("")
+    lines.append("REST calls:")
+    lines += [f"  {count:>7}  {route}" for route, count in calls.most_common()]
+    return '\n'.join(lines)
+
+
+async def run_load_test(stages, stage_seconds, guilds, campaigns, http_latency, keep_rate_limits=False,
+                        keep_background_tasks=False, keep_coalescing=False):
+    # Imported late so the caller can point the database at a throwaway file first
+    from lfg_bot.bot import VentureVaultBot, intents
+
+    bot = VentureVaultBot(command_prefix='!', intents=intents, chunk_guilds_at_startup=False,
+                          guild_ready_timeout=0.1)
+    load_test = LoadTest(bot, guilds, campaigns, http_latency, keep_rate_limits, keep_background_tasks,
+                         keep_coalescing)
+    async with bot:
+        await load_test.start(max(stages))
+        results = []
+        for users in stages:
+            print(f"Running {users} users for {stage_seconds}s...")
+            results.append(await load_test.run_stage(users, stage_seconds))
+        await bot.close()
+    return results, load_test.fake.calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive VentureVaultBot with synthetic Discord traffic")
+    parser.add_argument('--stages', default='1,2,5,10,25,50',
+                        help="Comma separated concurrent virtual users per stage (default: %(default)s)")
+    parser.add_argument('--stage-seconds', type=float, default=10)
+    parser.add_argument('--guilds', type=int, default=4)
+    parser.add_argument('--campaigns', type=int, default=8)
+    parser.add_argument('--http-latency', type=float, default=0.05,
+                        help="Simulated Discord API round trip in seconds (default: %(default)s)")
+    parser.add_argument('--keep-rate-limits', action='store_true',
+                        help="Leave the command rate limits on; by default they are unloaded")
+    parser.add_argument('--keep-background-tasks', action='store_true',
+                        help="Leave the channel reconciler and reminder scheduler running; "
+                             "by default they are unloaded")
+    parser.add_argument('--keep-coalescing', action='store_true',
+                        help="Let repeated listings share one reply; by default every listing is run")
+    parser.add_argument('--database', help="SQLite file to use (default: a temporary file)")
+    args = parser.parse_args(argv)
+
+    stages = [int(users) for users in args.stages.split(',')]
+    logging.getLogger('discord').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.init(args.database or os.path.join(tmp, 'loadtest.db'))
+        db.connect(reuse_if_open=True)
+        create_schema()
+        results, calls = asyncio.run(run_load_test(stages, args.stage_seconds, args.guilds, args.campaigns,
+                                                   args.http_latency, args.keep_rate_limits,
+                                                   args.keep_background_tasks, args.keep_coalescing))
+        print()
+        print(format_report(results, calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+from bisect import bisect_left, insort
+
+
+class PrefixIndex:
+    """Sorted (key, id) pairs so a prefix lookup is a bisect plus a short scan"""
+
+    def __init__(self):
+        self._entries = []
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, entry_id, *keys):
+        self.remove(entry_id)
+        keys = {key.lower() for key in keys if key}
+        self._keys[entry_id] = keys
+        for key in keys:
+            insort(self._entries, (key, entry_id))
+
+    def remove(self, entry_id):
+        for key in self._keys.pop(entry_id, ()):
+            position = bisect_left(self._entries, (key, entry_id))
+            if position < len(self._entries) and self._entries[position] == (key, entry_id):
+                del self._entries[position]
+
+    def clear(self):
+        self._entries.clear()
+        self._keys.clear()
+
+    def search(self, prefix, limit=25, predicate=None):
+        """Return up to limit distinct ids with a key starting with prefix"""
+        prefix = prefix.lower()
+        found = []
+        seen = set()
+        position = bisect_left(self._entries, (prefix,))
+        while position < len(self._entries) and len(found) < limit:
+            key, entry_id = self._entries[position]
+            if not key.startswith(prefix):
+                break
+            position += 1
+            if entry_id in seen or (predicate and not predicate(entry_id)):
+                continue
+            seen.add(entry_id)
+            found.append(entry_id)
+        return found
+
+
+class CampaignIndex:
+    """In-memory copy of the campaign and plot point fields used by autocomplete
+
+    Commands that write campaigns or plot points update it directly, so
+    autocomplete never queries the database while a user is typing.
+    """
+
+    def __init__(self):
+        self.campaigns = {}
+        self.plot_points = {}
+        self._campaign_keys = PrefixIndex()
+        self._plot_keys = PrefixIndex()
+        self.loaded = False
+
+    async def rebuild(self, storage):
+        """Load every campaign and plot point with one query each"""
+        campaign_rows = await storage.campaign_keys()
+        plot_rows = await storage.plot_point_keys()
+        self.campaigns.clear()
+        self.plot_points.clear()
+        self._campaign_keys.clear()
+        self._plot_keys.clear()
+        for campaign_id, name, dm_id in campaign_rows:
+            self.add_campaign(campaign_id, name, dm_id)
+        for plot_id, campaign_id, number, title in plot_rows:
+            self.add_plot_point(plot_id, campaign_id, number, title)
+        self.loaded = True
+
+    def add_campaign(self, campaign_id, name, dm_id=None):
+        self.campaigns[campaign_id] = (name, dm_id)
+        self._campaign_keys.add(campaign_id, str(campaign_id), name)
+
+    def remove_campaign(self, campaign_id):
+        self.campaigns.pop(campaign_id, None)
+        self._campaign_keys.remove(campaign_id)
+        for plot_id in [p for p, (c, _, _) in self.plot_points.items() if c == campaign_id]:
+            self.remove_plot_point(plot_id)
+
+    def add_plot_point(self, plot_id, campaign_id, number, title):
+        self.plot_points[plot_id] = (campaign_id, number, title)
+        self._plot_keys.add(plot_id, str(plot_id), number, title)
+
+    def remove_plot_point(self, plot_id):
+        self.plot_points.pop(plot_id, None)
+        self._plot_keys.remove(plot_id)
+
+    def _can_edit(self, campaign_id, user_id):
+        name, dm_id = self.campaigns.get(campaign_id, (None, None))
+        return dm_id is None or dm_id == str(user_id)
+
+    def campaign_choices(self, current, user_id, limit=25):
+        """(label, campaign_id) pairs for campaigns the user runs"""
+        ids = self._campaign_keys.search(current, limit, lambda c: self._can_edit(c, user_id))
+        return [(f"{campaign_id}: {self.campaigns[campaign_id][0]}"[:100], campaign_id) for campaign_id in ids]
+
+    def plot_point_choices(self, current, user_id, limit=25):
+        """(label, plot_id) pairs for plot points in campaigns the user runs"""
+        ids = self._plot_keys.search(current, limit, lambda p: self._can_edit(self.plot_points[p][0], user_id))
+        choices = []
+        for plot_id in ids:
+            campaign_id, number, title = self.plot_points[plot_id]
+            campaign_name = self.campaigns.get(campaign_id, ("?", None))[0]
+            choices.append((f"{number}: {title} ({campaign_name})"[:100], plot_id))
+        return choices
+
+
+# Shared by every cog in this process
+campaign_index = CampaignIndex()
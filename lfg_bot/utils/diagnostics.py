@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from config.config import LOOP_LAG_LOG_MINUTES, LOOP_LAG_SAMPLE_SECONDS, SLOW_CALLBACK_MS
+
+log = logging.getLogger(__name__)
+
+# Lag samples kept for !diag, 10 minutes at the default sample interval
+LAG_HISTORY = 6000
+
+# Slow callbacks kept for !diag
+SLOW_CALLBACK_HISTORY = 50
+
+# Innermost frames kept from a blocked loop's stack
+STACK_DEPTH = 12
+
+
+def percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+@dataclass
+class SlowCallback:
+    """One time the event loop was blocked, as seen from the watchdog thread"""
+    detected_at: datetime
+    task: str
+    context: str
+    location: str = "unknown"  # Innermost frame, e.g. 'storage.py:171 in get_campaign'
+    stack: list = field(default_factory=list)
+    lag: float = None  # How late the loop got, filled in once it runs again
+
+
+class LoopMonitor:
+    """Measures event loop lag and catches callbacks that block the loop
+
+    A sampler task sleeps for sample_seconds at a time and records how late
+    it wakes up, which is the lag every other callback saw at that moment.
+    It also stamps a heartbeat that a watchdog thread checks: if the
+    heartbeat is more than threshold overdue, a callback is blocking the
+    loop right now, so the thread grabs the loop thread's stack and the
+    command or interaction the running task is serving. Blocks are only
+    seen when they overlap a sample, which keeps the overhead to one timer
+    per sample interval; anything blocking longer than sample_seconds plus
+    threshold is always caught.
+    """
+
+    def __init__(self, sample_seconds=LOOP_LAG_SAMPLE_SECONDS, threshold=SLOW_CALLBACK_MS / 1000,
+                 log_minutes=LOOP_LAG_LOG_MINUTES):
+        self.sample_seconds = sample_seconds
+        self.threshold = threshold
+        self.log_seconds = log_minutes * 60
+        self.lag = deque(maxlen=LAG_HISTORY)
+        self.slow_callbacks = deque(maxlen=SLOW_CALLBACK_HISTORY)
+        self.blocked_count = 0
+        self.started_at = None
+        self._labels = weakref.WeakKeyDictionary()
+        self._heartbeat = None
+        self._captured = None
+        self._loop = None
+        self._loop_thread_id = None
+        self._task = None
+        self._stop = None
+
+    @contextmanager
+    def running(self, label):
+        """Label the current task with the command or interaction it is serving"""
+        task = asyncio.current_task()
+        previous = self._labels.get(task)
+        self._labels[task] = label
+        try:
+            yield
+        finally:
+            if previous is None:
+                self._labels.pop(task, None)
+            else:
+                self._labels[task] = previous
+
+    @property
+    def is_running(self):
+        return self._task is not None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.started_at = self.started_at or datetime.now()
+        self._stop = threading.Event()
+        self._task = self._loop.create_task(self._sample())
+        threading.Thread(target=self._watch, args=(self._stop,), name='loop-watchdog', daemon=True).start()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        last_log = loop.time()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_seconds)
+            now = loop.time()
+            lag = max(0.0, now - started - self.sample_seconds)
+            self.lag.append(lag)
+            previous, self._heartbeat = self._heartbeat, time.monotonic()
+
+            if lag >= self.threshold:
+                self.blocked_count += 1
+                captured, self._captured = self._captured, None
+                if captured and captured[0] == previous:
+                    self._report(captured[1], lag)
+
+            if now - last_log >= self.log_seconds:
+                self._log_summary()
+                last_log = now
+
+    def _watch(self, stop):
+        # Runs in its own thread, so it can look at the loop while it is stuck
+        reported = None
+        while not stop.wait(self.sample_seconds / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.sample_seconds
+            if overdue < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            try:
+                self._captured = (heartbeat, self._capture())
+            except Exception as e:
+                log.warning("Could not capture the blocked event loop: %s", e)
+
+    def _capture(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        frames = traceback.extract_stack(frame)[-STACK_DEPTH:] if frame else []
+        task = asyncio.current_task(self._loop)
+        slow = SlowCallback(
+            detected_at=datetime.now(),
+            task=task.get_name() if task else "no task",
+            context=self._labels.get(task, "background work") if task else "event loop callback",
+        )
+        if frames:
+            innermost = frames[-1]
+            slow.location = f"{os.path.basename(innermost.filename)}:{innermost.lineno} in {innermost.name}"
+            slow.stack = traceback.format_list(frames)
+        return slow
+
+    def _report(self, slow, lag):
+        slow.lag = lag
+        self.slow_callbacks.append(slow)
+        # The stack goes in the message itself; the configured formatters drop the extra fields
+        log.warning(
+            "Event loop blocked for %.0f ms by %s (task %s) at %s\n%s",
+            lag * 1000, slow.context, slow.task, slow.location, ''.join(slow.stack).rstrip(),
+            extra={'event': 'loop_blocked', 'lag_ms': round(lag * 1000), 'context': slow.context,
+                   'task': slow.task, 'stack': ''.join(slow.stack)}
+        )
+
+    def stats(self):
+        lag = list(self.lag)
+        return {
+            'samples': len(lag),
+            'window_seconds': len(lag) * self.sample_seconds,
+            'p50_ms': (percentile(lag, 50) or 0) * 1000,
+            'p99_ms': (percentile(lag, 99) or 0) * 1000,
+            'max_ms': max(lag, default=0) * 1000,
+            'blocked': self.blocked_count,
+        }
+
+    def _log_summary(self):
+        stats = self.stats()
+        log.info(
+            "Event loop lag p50 %.1f ms, p99 %.1f ms, max %.1f ms over %d samples (%.0f s); %d slow callbacks",
+            stats['p50_ms'], stats['p99_ms'], stats['max_ms'], stats['samples'], stats['window_seconds'],
+            stats['blocked'],
+            extra={'event': 'loop_lag', **stats}
+        )
+
+
+_loop_monitor = None
+
+
+def get_loop_monitor():
+    """Return the process-wide event loop monitor"""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor()
+    return _loop_monitor
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+
+import discord
+
+from config.config import EMBED_CACHE_SIZE
+
+STATUS_EMOJI = {
+    'Inactive': "🔘",
+    'Active': "🟢",
+    'Complete': "✅",
+    'Finished': "✅",
+}
+
+# Fields that make up what a user sees; Discord adds others (type, flags) to sent embeds
+VISIBLE_EMBED_KEYS = ('title', 'description', 'color', 'fields')
+
+
+def status_label(status):
+    return f"{STATUS_EMOJI.get(status, '🔘')} {status}"
+
+
+def status_color(status):
+    if status in ('Complete', 'Finished'):
+        return discord.Color.green()
+    return discord.Color.blue()
+
+
+class EmbedCache:
+    """Bounded LRU of serialized embed payloads
+
+    Keys include the version of the rows an embed was rendered from, so an
+    entry never goes stale: a change produces a new key and the old entry
+    ages out.
+    """
+
+    def __init__(self, max_entries=EMBED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._payloads = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def get(self, key):
+        payload = self._payloads.get(key)
+        if payload is not None:
+            self._payloads.move_to_end(key)
+            self.hits += 1
+        return payload
+
+    def put(self, key, payload):
+        self.misses += 1
+        self._payloads[key] = payload
+        self._payloads.move_to_end(key)
+        while len(self._payloads) > self.max_entries:
+            self._payloads.popitem(last=False)
+        return payload
+
+
+embed_cache = EmbedCache()
+
+
+def _embed_from(payload):
+    # Embed.from_dict keeps the fields list, copy it so the cached payload can't be mutated
+    return discord.Embed.from_dict({**payload, 'fields': [dict(field) for field in payload.get('fields', [])]})
+
+
+def _render_plot_point(plot_point):
+    embed = discord.Embed(
+        title=f"Plot Point {plot_point.number}: {plot_point.title}",
+        description=plot_point.description,
+        color=status_color(plot_point.status)
+    )
+    embed.add_field(name="Status", value=status_label(plot_point.status), inline=False)
+    return embed.to_dict()
+
+
+def plot_point_payload(plot_point):
+    key = ('plot_point', plot_point.id, plot_point.version)
+    return embed_cache.get(key) or embed_cache.put(key, _render_plot_point(plot_point))
+
+
+def plot_point_embed(plot_point):
+    """Embed for a plot point's overview message, rendered once per version"""
+    return _embed_from(plot_point_payload(plot_point))
+
+
+async def plot_point_list_embed(campaign, load_plot_points):
+    """Embed listing a campaign's plot points, or None if it has none
+
+    Keyed by the campaign's version, which changes whenever any of its plot
+    points do, so load_plot_points() is only awaited on a cache miss.
+    """
+    key = ('plot_point_list', campaign.id, campaign.version)
+    payload = embed_cache.get(key)
+    if payload is None:
+        plot_points = await load_plot_points()
+        if not plot_points:
+            return None
+
+        embed = discord.Embed(
+            title=f"Plot Points for {campaign.name}",
+            description=f"Campaign ID: {campaign.id}",
+            color=discord.Color.blue()
+        )
+        for plot in plot_points:
+            embed.add_field(
+                name=f"{plot.number}: {plot.title} ({status_label(plot.status)})",
+                value=f"{plot.description[:100]}..." if len(plot.description) > 100 else plot.description,
+                inline=False
+            )
+        payload = embed_cache.put(key, embed.to_dict())
+    return _embed_from(payload)
+
+
+def message_shows(message, payload):
+    """True if the message's first embed already matches the payload"""
+    if not message.embeds:
+        return False
+    current = message.embeds[0].to_dict()
+    return all(current.get(key) == payload.get(key) for key in VISIBLE_EMBED_KEYS)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from config.config import EVENT_BUS_BACKEND, EVENT_BUS_PATH, EVENT_BUS_POLL_SECONDS
+
+log = logging.getLogger(__name__)
+
+# Default time a lease is held before another process may take it over
+LEASE_SECONDS = 30
+
+# Events older than this are pruned from the shared SQLite log
+EVENT_RETENTION_SECONDS = 300
+
+
+class EventBus:
+    """Publish/subscribe for events that other bot processes need to see
+
+    Handlers are coroutines taking the event payload as keyword arguments.
+    Events are always delivered to local subscribers straight away; shared
+    backends also deliver them to every other process. Leases let exactly
+    one process (and one task within it) perform the Discord side effects
+    for a given key, e.g. one plot point's status change.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers = defaultdict(list)
+
+    def subscribe(self, topic, handler):
+        self._handlers[topic].append(handler)
+
+    def unsubscribe(self, topic, handler):
+        if handler in self._handlers[topic]:
+            self._handlers[topic].remove(handler)
+
+    async def _dispatch(self, topic, payload):
+        for handler in list(self._handlers[topic]):
+            try:
+                await handler(**payload)
+            except Exception as e:
+                log.exception("Event handler for %s failed: %s", topic, e)
+
+    async def publish(self, topic, **payload):
+        await self._dispatch(topic, payload)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def acquire_lease(self, key, ttl=LEASE_SECONDS):
+        """Try to take the lease on key, returning a token or None if it is held"""
+        raise NotImplementedError
+
+    async def release_lease(self, key, token):
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def lease(self, key, ttl=LEASE_SECONDS):
+        """Yield True if this task holds the lease on key for the block"""
+        token = await self.acquire_lease(key, ttl)
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                await self.release_lease(key, token)
+
+
+class InProcessEventBus(EventBus):
+    """Event bus for a single bot process"""
+
+    def __init__(self):
+        super().__init__()
+        self._leases = {}
+
+    async def acquire_lease(self, key, ttl=LEASE_SECONDS):
+        now = time.monotonic()
+        held = self._leases.get(key)
+        if held and held[1] > now:
+            return None
+        token = uuid.uuid4().hex
+        self._leases[key] = (token, now + ttl)
+        return token
+
+    async def release_lease(self, key, token):
+        if self._leases.get(key, (None,))[0] == token:
+            del self._leases[key]
+
+
+class SqliteEventBus(EventBus):
+    """Event bus shared by every process on the host through a SQLite file
+
+    Published events are appended to an event table that each process
+    tails by id, so delivery to other processes takes at most one poll
+    interval. Leases are rows claimed with an upsert that only succeeds
+    when the lease is free or expired.
+    """
+
+    def __init__(self, path=EVENT_BUS_PATH, poll_seconds=EVENT_BUS_POLL_SECONDS):
+        super().__init__()
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._connection = None
+        self._lock = asyncio.Lock()
+        self._last_id = 0
+        self._poll_task = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS event ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, payload TEXT NOT NULL, "
+            "origin TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS lease ("
+            "key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        return connection
+
+    async def _run(self, sql, params=()):
+        # SQLite calls run in a worker thread so a busy file never blocks the event loop
+        async with self._lock:
+            return await asyncio.to_thread(lambda: self._connection.execute(sql, params).fetchall())
+
+    async def start(self):
+        if self._connection is not None:
+            return
+        self._connection = await asyncio.to_thread(self._connect)
+        # Only deliver events published from now on
+        rows = await self._run("SELECT COALESCE(MAX(id), 0) FROM event")
+        self._last_id = rows[0][0]
+        self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def publish(self, topic, **payload):
+        if self._connection is not None:
+            await self._run(
+                "INSERT INTO event (topic, payload, origin, created_at) VALUES (?, ?, ?, ?)",
+                (topic, json.dumps(payload), self.origin, time.time())
+            )
+        await self._dispatch(topic, payload)
+
+    async def poll(self):
+        """Deliver events other processes published since the last poll"""
+        rows = await self._run(
+            "SELECT id, topic, payload, origin FROM event WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        )
+        for event_id, topic, payload, origin in rows:
+            self._last_id = event_id
+            if origin != self.origin:
+                await self._dispatch(topic, json.loads(payload))
+
+    async def _poll_loop(self):
+        last_prune = 0
+        while True:
+            try:
+                await self.poll()
+                now = time.time()
+                if now - last_prune > EVENT_RETENTION_SECONDS:
+                    await self._run("DELETE FROM event WHERE created_at < ?", (now - EVENT_RETENTION_SECONDS,))
+                    await self._run("DELETE FROM lease WHERE expires_at < ?", (now,))
+                    last_prune = now
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Event bus poll failed: %s", e)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def acquire_lease(self, key, ttl=LEASE_SECONDS):
+        now = time.time()
+        token = uuid.uuid4().hex
+        rows = await self._run(
+            "INSERT INTO lease (key, token, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at "
+            "WHERE lease.expires_at < ? "
+            "RETURNING token",
+            (key, token, now + ttl, now)
+        )
+        return token if rows else None
+
+    async def release_lease(self, key, token):
+        await self._run("DELETE FROM lease WHERE key = ? AND token = ?", (key, token))
+
+
+_event_bus = None
+
+
+def get_event_bus():
+    """Return the process-wide event bus chosen by EVENT_BUS_BACKEND"""
+    global _event_bus
+    if _event_bus is None:
+        if EVENT_BUS_BACKEND == 'local':
+            _event_bus = InProcessEventBus()
+        elif EVENT_BUS_BACKEND == 'sqlite':
+            _event_bus = SqliteEventBus()
+        else:
+            raise ValueError(f"Unknown EVENT_BUS_BACKEND: {EVENT_BUS_BACKEND}")
+    return _event_bus
@@ -0,0 +1,19 @@
+import logging
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+async def sync_guild_commands(bot, guild):
+    """Sync the slash command tree to one guild
+
+    Guild syncs show up immediately, unlike global syncs which can take
+    up to an hour to propagate.
+    """
+    bot.tree.copy_global_to(guild=guild)
+    try:
+        synced = await bot.tree.sync(guild=guild)
+        log.info("Synced %d slash commands to guild %s", len(synced), guild.id)
+    except discord.HTTPException as e:
+        log.warning("Could not sync slash commands to guild %s: %s", guild.id, e)
@@ -0,0 +1,131 @@
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
+
+from config.config import SHUTDOWN_DRAIN_SECONDS
+
+log = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """Keeps track of running work so cogs can be reloaded and the bot stopped without dropping it
+
+    Commands and interactions run inside track(), keyed by the extension
+    that handles them. Shared resources (storage, event bus) belong to the
+    lifecycle rather than to a cog: cogs register their close callbacks and
+    the handles stay open across reloads, so a reloaded cog takes over the
+    same ones. They are only closed at shutdown, after running work is done.
+    """
+
+    def __init__(self, drain_seconds=SHUTDOWN_DRAIN_SECONDS):
+        self.drain_seconds = drain_seconds
+        self.accepting = True
+        self._tasks = {}
+        self._reloading = set()
+        self._changed = asyncio.Event()
+        self._resources = []
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def in_flight(self, keys=None):
+        """Number of tracked tasks for keys (all of them if None), not counting the caller"""
+        current = asyncio.current_task()
+        return sum(1 for task, key in self._tasks.items()
+                   if task is not current and (keys is None or key in keys))
+
+    @asynccontextmanager
+    async def track(self, key=None):
+        """Count the block as running work for key
+
+        While key's extension is being reloaded, new work waits here until
+        the new version is in place.
+        """
+        while key in self._reloading:
+            await self._changed.wait()
+
+        task = asyncio.current_task()
+        # Nested blocks in the same task count once
+        owner = task not in self._tasks
+        if owner:
+            self._tasks[task] = key
+        try:
+            yield
+        finally:
+            if owner:
+                del self._tasks[task]
+                self._notify()
+
+    async def drain(self, keys=None, timeout=None):
+        """Wait until no work is running for keys, returning False on timeout"""
+        timeout = self.drain_seconds if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.in_flight(keys):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def add_resource(self, close):
+        """Register the close callback of a shared resource, to run once at shutdown"""
+        if close not in self._resources:
+            self._resources.append(close)
+
+    async def close_resources(self):
+        # Closed in reverse order of registration
+        while self._resources:
+            close = self._resources.pop()
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                log.exception("Failed to close %r: %s", close, e)
+
+    async def reload(self, bot, name):
+        """Reload an extension once the work it is running has finished
+
+        New work for the extension is held back until the reload is done and
+        then runs on the new version. Shared resources stay open throughout.
+        Returns False if the drain timed out and the reload went ahead anyway.
+        """
+        self._reloading.add(name)
+        try:
+            drained = await self.drain({name})
+            await bot.reload_extension(name)
+        finally:
+            self._reloading.discard(name)
+            self._notify()
+        return drained
+
+    async def shutdown(self, bot):
+        """Stop taking new work, let running work finish, then unload cogs and close resources"""
+        self.accepting = False
+        if not await self.drain():
+            log.warning("Shutting down with %d commands or interactions still running", self.in_flight())
+
+        for name in tuple(bot.extensions):
+            try:
+                await bot.unload_extension(name)
+            except Exception as e:
+                log.exception("Failed to unload %s: %s", name, e)
+
+        await self.close_resources()
+
+
+_lifecycle = None
+
+
+def get_lifecycle():
+    """Return the process-wide lifecycle manager"""
+    global _lifecycle
+    if _lifecycle is None:
+        _lifecycle = Lifecycle()
+    return _lifecycle
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+# Sweep idle buckets at most this often
+SWEEP_INTERVAL_SECONDS = 60
+
+
+def parse_rate(value):
+    """Parse "<count>/<seconds>" into (capacity, tokens per second)"""
+    count, seconds = value.split('/')
+    count, seconds = int(count), float(seconds)
+    return count, count / seconds
+
+
+class TokenBucketLimiter:
+    """Token buckets for many keys, one (tokens, updated_at) tuple each
+
+    A bucket that has refilled to capacity behaves exactly like a missing
+    one, so idle buckets are swept out and memory only grows with the
+    number of keys that were active recently.
+    """
+
+    def __init__(self, capacity, rate, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self._buckets = {}
+        self._last_sweep = clock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _tokens(self, key, now):
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, key, now=None):
+        """Seconds until key has a token, 0 if one is available now"""
+        now = self.clock() if now is None else now
+        tokens = self._tokens(key, now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, key, now=None):
+        now = self.clock() if now is None else now
+        self._buckets[key] = (self._tokens(key, now) - 1, now)
+        if now - self._last_sweep > SWEEP_INTERVAL_SECONDS:
+            self.sweep(now)
+
+    def sweep(self, now=None):
+        now = self.clock() if now is None else now
+        full = [key for key in self._buckets if self._tokens(key, now) >= self.capacity]
+        for key in full:
+            del self._buckets[key]
+        self._last_sweep = now
+
+
+class RequestCoalescer:
+    """Share one in-flight (or just finished) result between identical requests
+
+    The first caller for a key runs the work; callers arriving while it
+    runs, or within window seconds after it finished, get the same result.
+    """
+
+    def __init__(self, window, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now):
+        expired = [key for key, (future, expires_at) in self._entries.items()
+                   if expires_at is not None and expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def invalidate(self):
+        """Forget finished results so the next request after a write re-queries"""
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[1] is None}
+
+    async def run(self, key, work):
+        """Return (result, leader); leader is True for the caller that ran work()"""
+        now = self.clock()
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry:
+            return await asyncio.shield(entry[0]), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (future, None)
+        try:
+            result = await work()
+        except BaseException as e:
+            # Don't cache failures; waiting followers see the same error
+            del self._entries[key]
+            future.set_exception(e)
+            future.exception()
+            raise
+
+        future.set_result(result)
+        self._entries[key] = (future, self.clock() + self.window)
+        return result, True
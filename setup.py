@@ -9,9 +9,15 @@ setup(
         'peewee',
         'python-dotenv'
     ],
+    extras_require={
+        'postgres': ['asyncpg'],
+        'parquet': ['pyarrow']
+    },
     entry_points={
         'console_scripts': [
-            'lfg-bot=lfg_bot.run:main'
+            'lfg-bot=lfg_bot.bot:run_bot',
+            'lfg-bot-export=lfg_bot.export:main',
+            'lfg-bot-loadtest=lfg_bot.loadtest:main'
         ]
     },
     author='Knuffle Puffle',
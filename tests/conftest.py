@@ -0,0 +1,84 @@
+import asyncio
+import re
+import sqlite3
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from peewee import SqliteDatabase
+
+from lfg_bot.database.models import Campaign, PlotPoint, Reminder, Session
+from lfg_bot.database.postgres import PostgresStorage
+from lfg_bot.database.storage import SqliteStorage
+
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+
+class FakePostgresPool:
+    """Stand-in for an asyncpg pool that runs the Postgres SQL on SQLite
+
+    Translates $1-style parameters, drops ::type casts and swaps the few
+    Postgres-only DDL bits the backend uses, so the contract tests need no
+    running server.
+    """
+
+    def __init__(self):
+        self.connection = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_DECLTYPES)
+        self.connection.row_factory = sqlite3.Row
+
+    @staticmethod
+    def _translate(sql):
+        sql = sql.replace('BIGSERIAL PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT')
+        sql = re.sub(r'::\w+', '', sql)
+        return re.sub(r'\$(\d+)', r'?\1', sql)
+
+    def _run(self, sql, args):
+        cursor = self.connection.execute(self._translate(sql), args)
+        rows = [dict(row) for row in cursor.fetchall()]
+        return rows
+
+    async def fetch(self, sql, *args):
+        return self._run(sql, args)
+
+    async def fetchrow(self, sql, *args):
+        rows = self._run(sql, args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql, *args):
+        row = await self.fetchrow(sql, *args)
+        return next(iter(row.values())) if row else None
+
+    async def execute(self, sql, *args):
+        self._run(sql, args)
+
+    async def executemany(self, sql, args):
+        self.connection.executemany(self._translate(sql), args)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self):
+        with self.connection:
+            yield
+
+    async def close(self):
+        self.connection.close()
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def storage(request, tmp_path):
+    if request.param == 'sqlite':
+        database = SqliteDatabase(str(tmp_path / 'test.db'))
+        backend = SqliteStorage(database)
+        # Point the shared models at the temporary file for this test
+        with database.bind_ctx([Campaign, PlotPoint, Session, Reminder]):
+            asyncio.run(backend.create_schema())
+            yield backend
+        database.close()
+    else:
+        backend = PostgresStorage(pool=FakePostgresPool())
+        asyncio.run(backend.create_schema())
+        yield backend
+        asyncio.run(backend.close())
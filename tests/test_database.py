@@ -0,0 +1,281 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from peewee import SqliteDatabase
+
+from lfg_bot.database.models import Campaign, PlotPoint, Reminder, Session
+from lfg_bot.database.storage import SqliteStorage
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_create_and_get_campaign(storage):
+    campaign = run(storage.create_campaign("Curse of Strahd", dm_id="42"))
+
+    fetched = run(storage.get_campaign(campaign.id))
+    assert fetched.name == "Curse of Strahd"
+    assert fetched.dm_id == "42"
+    assert fetched.plot_category_id is None
+    assert isinstance(fetched.created_at, datetime)
+
+
+def test_get_missing_rows_returns_none(storage):
+    assert run(storage.get_campaign(999)) is None
+    assert run(storage.get_plot_point(999)) is None
+
+
+def test_update_campaign(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+
+    run(storage.update_campaign(campaign.id, plot_category_id="1234"))
+
+    assert run(storage.get_campaign(campaign.id)).plot_category_id == "1234"
+
+
+def test_update_rejects_unknown_fields(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+
+    with pytest.raises(ValueError):
+        run(storage.update_campaign(campaign.id, id=5))
+
+
+def test_list_campaigns_for_dm_counts_plot_points(storage):
+    first = run(storage.create_campaign("First", dm_id="1"))
+    second = run(storage.create_campaign("Second", dm_id="1"))
+    run(storage.create_campaign("Someone else's", dm_id="2"))
+    run(storage.create_plot_point(first.id, "01", "Start", "A start"))
+    run(storage.create_plot_point(first.id, "02", "Middle", "A middle"))
+
+    campaigns = run(storage.list_campaigns_for_dm("1"))
+
+    assert [(campaign.id, count) for campaign, count in campaigns] == [(first.id, 2), (second.id, 0)]
+
+
+def test_plot_point_lifecycle(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    plot_point = run(storage.create_plot_point(campaign.id, "03a", "Ambush", "Goblins"))
+    assert plot_point.status == 'Inactive'
+    assert plot_point.campaign_id == campaign.id
+
+    updated = run(storage.update_plot_point(plot_point.id, status='Active', channel_id="555"))
+    assert (updated.status, updated.channel_id) == ('Active', "555")
+
+    assert run(storage.delete_plot_point(plot_point.id)) is True
+    assert run(storage.delete_plot_point(plot_point.id)) is False
+    assert run(storage.get_plot_point(plot_point.id)) is None
+
+
+def test_list_plot_points_orders_by_number(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    other = run(storage.create_campaign("Other"))
+    for number in ["02", "01", "03b", "03a"]:
+        run(storage.create_plot_point(campaign.id, number, f"Plot {number}", "..."))
+    run(storage.create_plot_point(other.id, "01", "Elsewhere", "..."))
+
+    numbers = [plot_point.number for plot_point in run(storage.list_plot_points(campaign.id))]
+
+    assert numbers == ["01", "02", "03a", "03b"]
+
+
+def test_keys_for_autocomplete(storage):
+    campaign = run(storage.create_campaign("Westmarch", dm_id="7"))
+    plot_point = run(storage.create_plot_point(campaign.id, "01", "Start", "..."))
+
+    assert run(storage.campaign_keys()) == [(campaign.id, "Westmarch", "7")]
+    assert run(storage.plot_point_keys()) == [(plot_point.id, campaign.id, "01", "Start")]
+
+
+def test_clear_channel_references(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    run(storage.update_campaign(campaign.id, plot_category_id="100"))
+    active = run(storage.create_plot_point(campaign.id, "01", "Active", "..."))
+    finished = run(storage.create_plot_point(campaign.id, "02", "Finished", "..."))
+    run(storage.update_plot_point(active.id, status='Active', channel_id="101"))
+    run(storage.update_plot_point(finished.id, status='Finished', channel_id="102"))
+
+    campaigns, plot_points = run(storage.referenced_channels())
+    assert campaigns == [(campaign.id, "100")]
+    assert sorted(plot_points) == [(active.id, 'Active', "101"), (finished.id, 'Finished', "102")]
+
+    run(storage.clear_channel_references(campaign_categories=[(campaign.id, "100")],
+                                         plot_channels=[(active.id, "101"), (finished.id, "102")]))
+
+    assert run(storage.referenced_channels()) == ([], [])
+    assert run(storage.get_plot_point(active.id)).status == 'Inactive'
+    assert run(storage.get_plot_point(finished.id)).status == 'Finished'
+
+
+def test_clear_channel_references_skips_rows_that_moved_on(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    run(storage.update_campaign(campaign.id, plot_category_id="200"))
+    reactivated = run(storage.create_plot_point(campaign.id, "01", "Reactivated", "..."))
+    finished = run(storage.create_plot_point(campaign.id, "02", "Finished", "..."))
+    run(storage.update_plot_point(reactivated.id, status='Active', channel_id="201"))
+    run(storage.update_plot_point(finished.id, status='Finished', channel_id="102"))
+    version = run(storage.get_campaign(campaign.id)).version
+
+    # Stale ids read before the category was recreated and the plot point reactivated
+    run(storage.clear_channel_references(campaign_categories=[(campaign.id, "100")],
+                                         plot_channels=[(reactivated.id, "101"), (finished.id, "102")]))
+
+    assert run(storage.get_campaign(campaign.id)).plot_category_id == "200"
+    current = run(storage.get_plot_point(reactivated.id))
+    assert (current.status, current.channel_id) == ('Active', "201")
+    # Finished in the meantime: the channel is cleared but it isn't reverted to Inactive
+    current = run(storage.get_plot_point(finished.id))
+    assert (current.status, current.channel_id) == ('Finished', None)
+    assert run(storage.get_campaign(campaign.id)).version == version + 1
+
+
+def test_writes_bump_versions(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    assert campaign.version == 1
+
+    plot_point = run(storage.create_plot_point(campaign.id, "01", "Start", "..."))
+    after_create = run(storage.get_campaign(campaign.id)).version
+    assert after_create > campaign.version
+
+    updated = run(storage.update_plot_point(plot_point.id, status='Active', channel_id="9"))
+    assert updated.version == plot_point.version + 1
+    after_update = run(storage.get_campaign(campaign.id)).version
+    assert after_update > after_create
+
+    run(storage.clear_channel_references(plot_channels=[(plot_point.id, "9")]))
+    assert run(storage.get_plot_point(plot_point.id)).version == updated.version + 1
+    after_clear = run(storage.get_campaign(campaign.id)).version
+    assert after_clear > after_update
+
+    run(storage.delete_plot_point(plot_point.id))
+    assert run(storage.get_campaign(campaign.id)).version > after_clear
+
+
+def test_latest_campaign(storage):
+    assert run(storage.latest_campaign()) is None
+    run(storage.create_campaign("First"))
+    second = run(storage.create_campaign("Second"))
+
+    assert run(storage.latest_campaign()).id == second.id
+
+
+def test_sessions(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    plot_point = run(storage.create_plot_point(campaign.id, "01", "Start", "..."))
+    now = datetime(2025, 3, 14, 18, 0)
+    later, reminders = run(storage.create_session(plot_point.id, datetime(2025, 3, 20, 19, 0),
+                                                  [('dm', 60, datetime(2025, 3, 20, 18, 0))]))
+    sooner, _ = run(storage.create_session(plot_point.id, datetime(2025, 3, 15, 19, 0)))
+    run(storage.create_session(plot_point.id, datetime(2025, 3, 1, 19, 0)))
+
+    assert [session.id for session in run(storage.list_sessions(plot_point.id, now))] == [sooner.id, later.id]
+    assert run(storage.pending_reminders(datetime(2025, 3, 20, 18, 0))) == [(reminders[0].id, reminders[0].fire_at)]
+    assert run(storage.pending_reminders(now)) == []
+
+    assert run(storage.claim_reminder(reminders[0].id, now)) is True
+    assert run(storage.claim_reminder(reminders[0].id, now)) is False
+    assert run(storage.get_reminder(reminders[0].id)).status == 'Sent'
+
+    assert run(storage.delete_session(later.id)) == [reminders[0].id]
+    assert run(storage.get_session(later.id)) is None
+    assert run(storage.get_reminder(reminders[0].id)) is None
+
+
+def test_delete_plot_point_deletes_its_sessions_and_reminders(storage):
+    campaign = run(storage.create_campaign("Westmarch"))
+    plot_point = run(storage.create_plot_point(campaign.id, "01", "Start", "..."))
+    other = run(storage.create_plot_point(campaign.id, "02", "Other", "..."))
+    session, (reminder,) = run(storage.create_session(plot_point.id, datetime(2025, 3, 20, 19, 0),
+                                                      [('dm', 60, datetime(2025, 3, 20, 18, 0))]))
+    kept, (kept_reminder,) = run(storage.create_session(other.id, datetime(2025, 3, 20, 19, 0),
+                                                        [('dm', 60, datetime(2025, 3, 20, 18, 0))]))
+
+    assert run(storage.delete_plot_point(plot_point.id)) is True
+
+    assert run(storage.get_session(session.id)) is None
+    assert run(storage.get_reminder(reminder.id)) is None
+    assert run(storage.pending_reminders(datetime(2025, 3, 21))) == [(kept_reminder.id, kept_reminder.fire_at)]
+    assert run(storage.get_session(kept.id)) is not None
+
+
+def test_model_save_bumps_version_in_sql(tmp_path):
+    database = SqliteDatabase(str(tmp_path / 'test.db'))
+    with database.bind_ctx([Campaign, PlotPoint, Session, Reminder]):
+        run(SqliteStorage(database).create_schema())
+        campaign = Campaign.create(name="Westmarch")
+        stale_campaign = Campaign.get_by_id(campaign.id)
+        plot_point = PlotPoint.create(campaign=campaign, number="01", title="Start", description="...")
+        stale_plot_point = PlotPoint.get_by_id(plot_point.id)
+        plot_point.status = 'Active'
+        plot_point.save()
+        assert Campaign.get_by_id(campaign.id).version == 3
+
+        # Saving instances read before those writes still moves the versions forward
+        stale_campaign.name = "Renamed"
+        stale_campaign.save()
+        stale_plot_point.title = "Renamed"
+        stale_plot_point.save()
+
+        assert stale_campaign.version == 4
+        assert Campaign.get_by_id(campaign.id).version == 5
+        assert stale_plot_point.version == PlotPoint.get_by_id(plot_point.id).version == 3
+    database.close()
+
+
+def test_create_schema_adds_version_to_old_sqlite_tables(tmp_path):
+    database = SqliteDatabase(str(tmp_path / 'old.db'))
+    database.execute_sql("CREATE TABLE campaign (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, "
+                         "plot_category_id VARCHAR(255), created_at DATETIME NOT NULL, dm_id VARCHAR(255))")
+    database.execute_sql("INSERT INTO campaign (name, created_at) VALUES ('Old', '2024-01-01 00:00:00')")
+
+    with database.bind_ctx([Campaign, PlotPoint, Session, Reminder]):
+        storage = SqliteStorage(database)
+        run(storage.create_schema())
+        assert run(storage.get_campaign(1)).version == 1
+    database.close()
+
+
+def test_create_schema_migrates_first_plot_point_cog_tables(tmp_path):
+    database = SqliteDatabase(str(tmp_path / 'old.db'))
+    database.execute_sql("CREATE TABLE campaign (id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, "
+                         "plot_category_id VARCHAR(255))")
+    database.execute_sql("CREATE TABLE plotpoint (id INTEGER NOT NULL PRIMARY KEY, campaign_id INTEGER NOT NULL, "
+                         "number VARCHAR(255) NOT NULL, title VARCHAR(255) NOT NULL, description TEXT NOT NULL, "
+                         "status VARCHAR(255) NOT NULL, channel_id VARCHAR(255), "
+                         "FOREIGN KEY (campaign_id) REFERENCES campaign (id))")
+    database.execute_sql("INSERT INTO campaign (name) VALUES ('Old')")
+    database.execute_sql("INSERT INTO plotpoint (campaign_id, number, title, description, status) "
+                         "VALUES (1, '01', 'Start', '...', 'Inactive')")
+
+    with database.bind_ctx([Campaign, PlotPoint, Session, Reminder]):
+        storage = SqliteStorage(database)
+        run(storage.create_schema())
+
+        campaign = run(storage.latest_campaign())
+        assert campaign.name == "Old"
+        assert campaign.dm_id is None
+        assert isinstance(campaign.created_at, datetime)
+        assert run(storage.campaign_keys()) == [(1, "Old", None)]
+        plot_point = run(storage.get_plot_point(1))
+        assert plot_point.potential_players is None
+        assert isinstance(plot_point.created_at, datetime)
+
+        created = run(storage.create_campaign("New", dm_id="42"))
+        assert run(storage.get_campaign(created.id)).dm_id == "42"
+    database.close()
+
+
+def test_create_schema_adds_attempts_to_old_reminder_tables(tmp_path):
+    database = SqliteDatabase(str(tmp_path / 'old.db'))
+    database.execute_sql("CREATE TABLE reminder (id INTEGER PRIMARY KEY, session_id INTEGER NOT NULL, "
+                         "kind VARCHAR(255) NOT NULL, offset_minutes INTEGER NOT NULL, fire_at DATETIME NOT NULL, "
+                         "status VARCHAR(255) NOT NULL, sent_at DATETIME)")
+    database.execute_sql("INSERT INTO reminder (session_id, kind, offset_minutes, fire_at, status) "
+                         "VALUES (1, 'dm', 60, '2025-03-14 18:00:00', 'Pending')")
+
+    with database.bind_ctx([Campaign, PlotPoint, Session, Reminder]):
+        storage = SqliteStorage(database)
+        run(storage.create_schema())
+        assert run(storage.get_reminder(1)).attempts == 0
+    database.close()
@@ -0,0 +1,20 @@
+import logging
+from datetime import datetime
+
+from lfg_bot.utils.diagnostics import LoopMonitor, SlowCallback
+
+
+def test_blocked_loop_warning_includes_the_stack(caplog):
+    monitor = LoopMonitor(sample_seconds=0.1, threshold=0.25)
+    slow = SlowCallback(detected_at=datetime.now(), task="Task-7", context="!list_campaigns by player",
+                        location="storage.py:171 in get_campaign",
+                        stack=['  File "storage.py", line 171, in get_campaign\n    return Campaign.get()\n'])
+
+    with caplog.at_level(logging.WARNING, logger='lfg_bot.utils.diagnostics'):
+        monitor._report(slow, 0.5)
+
+    # Plain formatters only print the message, so the stack has to be in it
+    message = caplog.records[-1].getMessage()
+    assert "blocked for 500 ms by !list_campaigns by player" in message
+    assert 'File "storage.py", line 171, in get_campaign' in message
+    assert monitor.slow_callbacks[-1].lag == 0.5
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from lfg_bot.utils.events import InProcessEventBus, SqliteEventBus
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, **payload):
+        self.events.append(payload)
+
+
+@pytest.fixture
+def buses(tmp_path):
+    """Two processes' buses sharing one file; the tests poll by hand"""
+    path = str(tmp_path / 'events.db')
+    return SqliteEventBus(path, poll_seconds=3600), SqliteEventBus(path, poll_seconds=3600)
+
+
+def test_events_reach_other_processes_once(buses):
+    first, second = buses
+    seen_first, seen_second = Recorder(), Recorder()
+    first.subscribe('plot_point.changed', seen_first)
+    second.subscribe('plot_point.changed', seen_second)
+
+    async def scenario():
+        await first.start()
+        await second.start()
+        try:
+            await first.publish('plot_point.changed', id=1, status='Active')
+            await first.poll()
+            await second.poll()
+            await second.poll()
+        finally:
+            await first.stop()
+            await second.stop()
+
+    run(scenario())
+
+    # Delivered locally straight away, and not again when the publisher polls its own event
+    assert seen_first.events == [{'id': 1, 'status': 'Active'}]
+    assert seen_second.events == [{'id': 1, 'status': 'Active'}]
+
+
+def test_events_published_before_start_are_not_replayed(buses):
+    first, second = buses
+    seen = Recorder()
+    second.subscribe('campaign.changed', seen)
+
+    async def scenario():
+        await first.start()
+        try:
+            await first.publish('campaign.changed', id=1)
+            await second.start()
+            await first.publish('campaign.changed', id=2)
+            await second.poll()
+        finally:
+            await first.stop()
+            await second.stop()
+
+    run(scenario())
+
+    assert seen.events == [{'id': 2}]
+
+
+def test_unsubscribed_handler_is_not_called():
+    bus = InProcessEventBus()
+    seen = Recorder()
+    bus.subscribe('plot_point.deleted', seen)
+    bus.unsubscribe('plot_point.deleted', seen)
+
+    run(bus.publish('plot_point.deleted', id=1))
+
+    assert seen.events == []
+
+
+def test_sqlite_lease_is_held_by_one_process(buses):
+    first, second = buses
+
+    async def scenario():
+        await first.start()
+        await second.start()
+        try:
+            token = await first.acquire_lease('plot_point:1')
+            assert token is not None
+            assert await second.acquire_lease('plot_point:1') is None
+            assert await second.acquire_lease('plot_point:2') is not None
+
+            # Only the holder's token releases it
+            await second.release_lease('plot_point:1', 'not-the-token')
+            assert await second.acquire_lease('plot_point:1') is None
+            await first.release_lease('plot_point:1', token)
+            assert await second.acquire_lease('plot_point:1') is not None
+        finally:
+            await first.stop()
+            await second.stop()
+
+    run(scenario())
+
+
+def test_sqlite_expired_lease_is_taken_over(buses):
+    first, second = buses
+
+    async def scenario():
+        await first.start()
+        await second.start()
+        try:
+            # A process that died holding the lease
+            stale = await first.acquire_lease('plot_point:1', ttl=-1)
+            taken = await second.acquire_lease('plot_point:1')
+            assert taken is not None
+
+            # The old holder releasing late doesn't free the new holder's lease
+            await first.release_lease('plot_point:1', stale)
+            assert await first.acquire_lease('plot_point:1') is None
+
+            async with second.lease('plot_point:2') as acquired:
+                assert acquired
+                async with first.lease('plot_point:2') as acquired_elsewhere:
+                    assert not acquired_elsewhere
+            assert await first.acquire_lease('plot_point:2') is not None
+        finally:
+            await first.stop()
+            await second.stop()
+
+    run(scenario())
+
+
+def test_in_process_lease():
+    bus = InProcessEventBus()
+
+    async def scenario():
+        token = await bus.acquire_lease('plot_point:1')
+        assert token is not None
+        assert await bus.acquire_lease('plot_point:1') is None
+
+        await bus.release_lease('plot_point:1', 'not-the-token')
+        assert await bus.acquire_lease('plot_point:1') is None
+        await bus.release_lease('plot_point:1', token)
+
+        # Expired leases are free again
+        assert await bus.acquire_lease('plot_point:1', ttl=0) is not None
+        assert await bus.acquire_lease('plot_point:1') is not None
+
+        async with bus.lease('plot_point:2') as acquired:
+            assert acquired
+            async with bus.lease('plot_point:2') as acquired_again:
+                assert not acquired_again
+        async with bus.lease('plot_point:2') as acquired:
+            assert acquired
+
+    run(scenario())
@@ -0,0 +1,58 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from lfg_bot.export import export_campaigns
+
+
+@pytest.fixture
+def campaign(storage):
+    async def create():
+        campaign = await storage.create_campaign("Westmarch")
+        await storage.create_campaign("Elsewhere")
+        # The first chunk has no channel ids at all, the second one does
+        for number in ["01", "02", "03"]:
+            await storage.create_plot_point(campaign.id, number, "Inactive", "...")
+        active = await storage.create_plot_point(campaign.id, "04", "Active", "...")
+        await storage.update_plot_point(active.id, status='Active', channel_id="555")
+        return campaign
+    return asyncio.run(create())
+
+
+def test_export_jsonl(storage, campaign, tmp_path):
+    path = tmp_path / 'export.jsonl.gz'
+
+    result = asyncio.run(export_campaigns(storage, str(path), 'jsonl', campaign.id, chunk_size=2))
+
+    with gzip.open(path, 'rt') as f:
+        rows = [json.loads(line) for line in f]
+    assert result.counts == {'campaign': 1, 'plot_point': 4}
+    assert [row['table'] for row in rows] == ['campaign'] + ['plot_point'] * 4
+    assert {row['campaign'] for row in rows[1:]} == {campaign.id}
+    assert rows[-1]['channel_id'] == "555"
+    assert result.watermark == datetime.fromisoformat(rows[-1]['created_at'])
+
+
+def test_export_since_watermark(storage, campaign, tmp_path):
+    first = asyncio.run(export_campaigns(storage, str(tmp_path / 'first.jsonl.gz')))
+
+    later = asyncio.run(export_campaigns(storage, str(tmp_path / 'later.jsonl.gz'), since=first.watermark))
+
+    assert first.counts == {'campaign': 2, 'plot_point': 4}
+    assert later.counts == {'campaign': 0, 'plot_point': 0}
+
+
+def test_export_parquet_with_null_first_chunk(storage, campaign, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    pa = pytest.importorskip('pyarrow')
+
+    result = asyncio.run(export_campaigns(storage, str(tmp_path), 'parquet', chunk_size=2))
+
+    plot_points = pq.read_table(tmp_path / 'plot_point.parquet')
+    assert result.counts == {'campaign': 2, 'plot_point': 4}
+    assert plot_points.column('channel_id').to_pylist() == [None, None, None, "555"]
+    assert plot_points.schema.field('created_at').type == pa.timestamp('us')
+    assert pq.read_table(tmp_path / 'campaign.parquet').column('name').to_pylist() == ["Westmarch", "Elsewhere"]
@@ -0,0 +1,117 @@
+import asyncio
+from itertools import count
+from types import SimpleNamespace
+
+from discord.ext import commands
+
+from lfg_bot.cogs.lfg import PlotPointBoardCog, PlotPointManagementView
+
+channel_ids = count(1000)
+
+
+class FakeChannel:
+    def __init__(self, name):
+        self.id = next(channel_ids)
+        self.name = name
+        self.deleted = False
+
+    async def send(self, content=None, **kwargs):
+        pass
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeDiscord:
+    """Just enough of a guild, bot and interaction for the plot point buttons"""
+
+    def __init__(self):
+        self.category = SimpleNamespace(id=1, text_channels=[])
+        self.channels = {}
+        self.replies = []
+        self.message = SimpleNamespace(embeds=[], edit=self._edit)
+
+    async def _edit(self, embed=None, view=None):
+        self.message.embeds = [embed]
+
+    async def create_text_channel(self, name, category=None):
+        channel = FakeChannel(name)
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_channel(self, channel_id):
+        return self.category if channel_id == self.category.id else self.channels.get(channel_id)
+
+    async def send_message(self, content, ephemeral=False):
+        self.replies.append(content)
+
+    def interaction(self):
+        return SimpleNamespace(user="player", guild=self, message=self.message,
+                               response=SimpleNamespace(send_message=self.send_message))
+
+
+def click(storage, discord, plot_point, button):
+    async def run():
+        view = PlotPointManagementView(plot_point, discord)
+        view.storage = storage
+        await getattr(view, button).callback(discord.interaction())
+    asyncio.run(run())
+
+
+def create_plot_point(storage, category_id="1"):
+    async def create():
+        campaign = await storage.create_campaign("Westmarch")
+        await storage.update_campaign(campaign.id, plot_category_id=category_id)
+        return await storage.create_plot_point(campaign.id, "01", "Start", "...")
+    return asyncio.run(create())
+
+
+def test_stale_activate_click_does_not_create_a_second_channel(storage):
+    plot_point = create_plot_point(storage)
+    discord = FakeDiscord()
+
+    # Both views were created while the plot point was Inactive
+    click(storage, discord, plot_point, 'activate_button')
+    click(storage, discord, plot_point, 'activate_button')
+
+    current = asyncio.run(storage.get_plot_point(plot_point.id))
+    assert len(discord.channels) == 1
+    assert (current.status, current.channel_id) == ('Active', str(next(iter(discord.channels))))
+    assert discord.replies == ["Activated plot point 01", "Plot point 01 is already Active."]
+
+
+def test_stale_deactivate_and_finished_clicks_do_nothing(storage):
+    plot_point = create_plot_point(storage)
+    discord = FakeDiscord()
+    click(storage, discord, plot_point, 'activate_button')
+    active = asyncio.run(storage.get_plot_point(plot_point.id))
+
+    click(storage, discord, active, 'deactivate_button')
+    click(storage, discord, active, 'deactivate_button')
+    click(storage, discord, active, 'finished_button')
+    click(storage, discord, active, 'finished_button')
+
+    assert asyncio.run(storage.get_plot_point(plot_point.id)).status == 'Finished'
+    assert discord.replies[1:] == ["Deactivated plot point 01", "Plot point 01 is already Inactive.",
+                                   "Marked plot point 01 as Finished", "Plot point 01 is already Finished."]
+
+
+def test_buttons_work_after_the_category_was_cleared(storage):
+    # The reconciler sets plot_category_id to NULL once the category is deleted
+    plot_point = create_plot_point(storage, category_id=None)
+    discord = FakeDiscord()
+
+    click(storage, discord, plot_point, 'activate_button')
+    active = asyncio.run(storage.get_plot_point(plot_point.id))
+    click(storage, discord, active, 'finished_button')
+
+    assert discord.replies == ["Activated plot point 01", "Marked plot point 01 as Finished"]
+    assert all(channel.deleted for channel in discord.channels.values())
+    assert asyncio.run(storage.get_plot_point(plot_point.id)).status == 'Finished'
+
+
+def test_post_plot_point_is_also_a_slash_command():
+    # Without the message content intent this is the only way to post the buttons
+    command = PlotPointBoardCog.post_plot_point
+    assert isinstance(command, commands.HybridCommand)
+    assert command.app_command.name == 'post_plot_point'
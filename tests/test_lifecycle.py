@@ -0,0 +1,137 @@
+import asyncio
+
+from lfg_bot.utils.lifecycle import Lifecycle
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeBot:
+    """Records extension reloads and unloads in order"""
+
+    def __init__(self, extensions=()):
+        self.extensions = dict.fromkeys(extensions)
+        self.log = []
+
+    async def reload_extension(self, name):
+        self.log.append(('reload', name))
+
+    async def unload_extension(self, name):
+        self.log.append(('unload', name))
+        del self.extensions[name]
+
+
+async def hold(lifecycle, key, release, log=None):
+    async with lifecycle.track(key):
+        if log is not None:
+            log.append(('start', key))
+        await release.wait()
+        if log is not None:
+            log.append(('done', key))
+
+
+def test_drain_waits_for_running_work():
+    async def scenario():
+        lifecycle = Lifecycle(drain_seconds=1)
+        release = asyncio.Event()
+        work = asyncio.create_task(hold(lifecycle, 'lfg_bot.cogs.lfg', release))
+        await asyncio.sleep(0)
+        assert lifecycle.in_flight() == 1
+
+        asyncio.get_running_loop().call_later(0.01, release.set)
+        assert await lifecycle.drain() is True
+        assert work.done()
+        assert lifecycle.in_flight() == 0
+
+    run(scenario())
+
+
+def test_drain_times_out_and_only_counts_the_given_keys():
+    async def scenario():
+        lifecycle = Lifecycle(drain_seconds=0.01)
+        release = asyncio.Event()
+        work = asyncio.create_task(hold(lifecycle, 'lfg_bot.cogs.lfg', release))
+        await asyncio.sleep(0)
+
+        assert await lifecycle.drain() is False
+        assert await lifecycle.drain({'lfg_bot.cogs.sessions'}) is True
+        release.set()
+        await work
+
+    run(scenario())
+
+
+def test_drain_does_not_wait_for_the_calling_task():
+    async def scenario():
+        lifecycle = Lifecycle(drain_seconds=0.01)
+        # e.g. !reload, which runs inside track() itself
+        async with lifecycle.track('lfg_bot.cogs.lifecycle'):
+            async with lifecycle.track('lfg_bot.cogs.lifecycle'):
+                assert lifecycle.in_flight() == 0
+                assert await lifecycle.drain() is True
+
+    run(scenario())
+
+
+def test_reload_holds_back_new_work_until_it_is_done():
+    async def scenario():
+        lifecycle = Lifecycle(drain_seconds=1)
+        bot = FakeBot()
+        log = bot.log
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(lifecycle, 'lfg_bot.cogs.lfg', release, log))
+        await asyncio.sleep(0)
+
+        reload = asyncio.create_task(lifecycle.reload(bot, 'lfg_bot.cogs.lfg'))
+        await asyncio.sleep(0)
+        started = asyncio.Event()
+        started.set()
+        new = asyncio.create_task(hold(lifecycle, 'lfg_bot.cogs.lfg', started, log))
+        other = asyncio.create_task(hold(lifecycle, 'lfg_bot.cogs.sessions', started, log))
+        await asyncio.sleep(0.01)
+
+        # Other extensions carry on; the reloading one's new work waits
+        assert ('start', 'lfg_bot.cogs.sessions') in log
+        assert log.count(('start', 'lfg_bot.cogs.lfg')) == 1
+
+        release.set()
+        assert await reload is True
+        await asyncio.gather(running, new, other)
+
+        lfg = [entry for entry in log if entry[1] == 'lfg_bot.cogs.lfg']
+        assert lfg == [('start', 'lfg_bot.cogs.lfg'), ('done', 'lfg_bot.cogs.lfg'), ('reload', 'lfg_bot.cogs.lfg'),
+                       ('start', 'lfg_bot.cogs.lfg'), ('done', 'lfg_bot.cogs.lfg')]
+
+    run(scenario())
+
+
+def test_shutdown_unloads_cogs_then_closes_resources_once_in_reverse_order():
+    async def scenario():
+        lifecycle = Lifecycle(drain_seconds=0.01)
+        bot = FakeBot(['lfg_bot.cogs.lfg', 'lfg_bot.cogs.sessions'])
+        closed = bot.log
+
+        async def close_storage():
+            closed.append(('close', 'storage'))
+
+        def close_events():
+            closed.append(('close', 'events'))
+
+        def broken():
+            raise RuntimeError("already closed")
+
+        # Every cog registers the shared resources, and reloads register them again
+        lifecycle.add_resource(close_storage)
+        lifecycle.add_resource(close_events)
+        lifecycle.add_resource(broken)
+        lifecycle.add_resource(close_storage)
+
+        await lifecycle.shutdown(bot)
+        await lifecycle.close_resources()
+
+        assert not lifecycle.accepting
+        assert closed == [('unload', 'lfg_bot.cogs.lfg'), ('unload', 'lfg_bot.cogs.sessions'),
+                          ('close', 'events'), ('close', 'storage')]
+
+    run(scenario())
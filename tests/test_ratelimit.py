@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from lfg_bot.utils.ratelimit import SWEEP_INTERVAL_SECONDS, RequestCoalescer, TokenBucketLimiter, parse_rate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_parse_rate():
+    assert parse_rate('5/10') == (5, 0.5)
+
+
+def test_bucket_rejects_once_empty():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(2, 1.0, clock=clock)
+
+    for _ in range(2):
+        assert limiter.retry_after('user') == 0
+        limiter.consume('user')
+
+    assert limiter.retry_after('user') == pytest.approx(1.0)
+    # Other keys have their own bucket
+    assert limiter.retry_after('someone else') == 0
+
+
+def test_bucket_refills_over_time_up_to_capacity():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(2, 0.5, clock=clock)
+    limiter.consume('user')
+    limiter.consume('user')
+
+    clock.advance(1)
+    assert limiter.retry_after('user') == pytest.approx(1.0)
+    clock.advance(1)
+    assert limiter.retry_after('user') == 0
+
+    # A long idle period refills to capacity, not beyond it
+    clock.advance(3600)
+    limiter.consume('user')
+    limiter.consume('user')
+    assert limiter.retry_after('user') > 0
+
+
+def test_sweep_drops_only_full_buckets():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(2, 1.0, clock=clock)
+    limiter.consume('idle')
+    clock.advance(SWEEP_INTERVAL_SECONDS - 1)
+    limiter.consume('busy')
+    limiter.consume('busy')
+    assert len(limiter) == 2
+
+    # consume() sweeps once the interval has passed; 'busy' hasn't refilled yet
+    clock.advance(1.5)
+    limiter.consume('busy')
+
+    assert len(limiter) == 1
+    assert limiter.retry_after('busy') > 0
+    assert limiter.retry_after('idle') == 0
+
+
+def test_coalescer_followers_share_the_leaders_result():
+    calls = []
+
+    async def main():
+        coalescer = RequestCoalescer(3, clock=FakeClock())
+        release = asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            await release.wait()
+            return 'listing'
+
+        leader = asyncio.create_task(coalescer.run('key', work))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(coalescer.run('key', work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await leader, await asyncio.gather(*followers)
+
+    leader, followers = asyncio.run(main())
+
+    assert calls == [1]
+    assert leader == ('listing', True)
+    assert followers == [('listing', False)] * 3
+
+
+def test_coalescer_reuses_results_within_the_window():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        clock = FakeClock()
+        coalescer = RequestCoalescer(3, clock=clock)
+        first = await coalescer.run('key', work)
+        clock.advance(2)
+        within = await coalescer.run('key', work)
+        clock.advance(1)
+        expired = await coalescer.run('key', work)
+        coalescer.invalidate()
+        invalidated = await coalescer.run('key', work)
+        return first, within, expired, invalidated, len(coalescer)
+
+    assert asyncio.run(main()) == ((1, True), (1, False), (2, True), (3, True), 1)
+
+
+def test_coalescer_failures_reach_followers_and_are_not_cached():
+    async def main():
+        coalescer = RequestCoalescer(3, clock=FakeClock())
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise RuntimeError("database is locked")
+
+        async def working():
+            return 'listing'
+
+        leader = asyncio.create_task(coalescer.run('key', failing))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(coalescer.run('key', working))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(leader, follower, return_exceptions=True)
+        return results, await coalescer.run('key', working)
+
+    (leader, follower), retry = asyncio.run(main())
+
+    assert isinstance(leader, RuntimeError)
+    assert isinstance(follower, RuntimeError)
+    assert retry == ('listing', True)
@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from peewee import SqliteDatabase
+
+from lfg_bot.cogs.reconciler import ReconcilerCog
+from lfg_bot.database.models import Campaign, PlotPoint
+from lfg_bot.database.storage import SqliteStorage
+
+
+class FakeGuild:
+    """Guild whose channel fetch runs a callback first, like a click landing mid-fetch"""
+
+    unavailable = False
+
+    def __init__(self, guild_id, channel_ids, during_fetch=None):
+        self.id = guild_id
+        self.channel_ids = channel_ids
+        self.during_fetch = during_fetch
+
+    async def fetch_channels(self):
+        if self.during_fetch:
+            await self.during_fetch()
+        return [SimpleNamespace(id=int(channel_id)) for channel_id in self.channel_ids]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    database = SqliteDatabase(str(tmp_path / 'test.db'))
+    backend = SqliteStorage(database)
+    with database.bind_ctx([Campaign, PlotPoint]):
+        asyncio.run(backend.create_schema())
+        yield backend
+    database.close()
+
+
+def reconcile(storage, guilds):
+    cog = ReconcilerCog(SimpleNamespace(guilds=guilds))
+    cog.storage = storage
+    return asyncio.run(cog.reconcile())
+
+
+def test_reconcile_clears_missing_channels(storage):
+    campaign = asyncio.run(storage.create_campaign("Westmarch"))
+    asyncio.run(storage.update_campaign(campaign.id, plot_category_id="100"))
+    live = asyncio.run(storage.create_plot_point(campaign.id, "01", "Live", "..."))
+    gone = asyncio.run(storage.create_plot_point(campaign.id, "02", "Gone", "..."))
+    asyncio.run(storage.update_plot_point(live.id, status='Active', channel_id="101"))
+    asyncio.run(storage.update_plot_point(gone.id, status='Active', channel_id="102"))
+
+    report = reconcile(storage, [FakeGuild(1, ["100", "101"])])
+
+    assert report.deactivated_plot_points == [gone.id]
+    assert asyncio.run(storage.get_plot_point(live.id)).status == 'Active'
+    current = asyncio.run(storage.get_plot_point(gone.id))
+    assert (current.status, current.channel_id) == ('Inactive', None)
+
+
+def test_reconcile_keeps_plot_points_activated_during_fetch(storage):
+    campaign = asyncio.run(storage.create_campaign("Westmarch"))
+    fresh = asyncio.run(storage.create_plot_point(campaign.id, "01", "Fresh", "..."))
+    finished = asyncio.run(storage.create_plot_point(campaign.id, "02", "Finished", "..."))
+    asyncio.run(storage.update_plot_point(finished.id, status='Active', channel_id="102"))
+
+    async def clicks():
+        # Activated after the fetch started, so its channel isn't in this guild's list
+        await storage.update_plot_point(fresh.id, status='Active', channel_id="201")
+        await storage.update_plot_point(finished.id, status='Finished')
+
+    report = reconcile(storage, [FakeGuild(1, [], during_fetch=clicks)])
+
+    assert fresh.id not in report.deactivated_plot_points
+    current = asyncio.run(storage.get_plot_point(fresh.id))
+    assert (current.status, current.channel_id) == ('Active', "201")
+    # Its channel is gone, but finishing it in the meantime isn't undone
+    current = asyncio.run(storage.get_plot_point(finished.id))
+    assert (current.status, current.channel_id) == ('Finished', None)
+
+
+def test_reconcile_skips_when_process_runs_some_shards(storage):
+    campaign = asyncio.run(storage.create_campaign("Westmarch"))
+    asyncio.run(storage.update_campaign(campaign.id, plot_category_id="100"))
+    plot_point = asyncio.run(storage.create_plot_point(campaign.id, "01", "Elsewhere", "..."))
+    asyncio.run(storage.update_plot_point(plot_point.id, status='Active', channel_id="101"))
+
+    # Shard 0 of 2: the category and channel live in a guild on the other shard
+    cog = ReconcilerCog(SimpleNamespace(guilds=[FakeGuild(1, [])], shard_count=2, shard_id=0))
+    cog.storage = storage
+    report = asyncio.run(cog.reconcile())
+
+    assert report.partial_shards
+    assert asyncio.run(storage.get_campaign(campaign.id)).plot_category_id == "100"
+    current = asyncio.run(storage.get_plot_point(plot_point.id))
+    assert (current.status, current.channel_id) == ('Active', "101")
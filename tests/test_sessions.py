@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from lfg_bot.cogs.sessions import ReminderScheduler
+
+NOW = datetime(2025, 3, 14, 18, 0)
+
+
+@pytest.fixture
+def session(storage):
+    async def create():
+        campaign = await storage.create_campaign("Westmarch", dm_id="42")
+        plot_point = await storage.create_plot_point(campaign.id, "01", "Start", "...")
+        session, _ = await storage.create_session(plot_point.id, NOW + timedelta(hours=2))
+        return session
+    return asyncio.run(create())
+
+
+def add_reminder(storage, session, fire_at, kind='dm'):
+    # A second session row per reminder keeps the test ids simple
+    _, (reminder,) = asyncio.run(storage.create_session(session.plot_point_id, session.starts_at,
+                                                        [(kind, 60, fire_at)]))
+    return reminder
+
+
+def status(storage, reminder):
+    return asyncio.run(storage.get_reminder(reminder.id))
+
+
+class Recorder:
+    """send_reminder stand-in that records what was sent, optionally failing first"""
+
+    def __init__(self, errors=()):
+        self.sent = []
+        self.errors = list(errors)
+
+    async def __call__(self, reminder, session, plot_point, campaign):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(reminder.id)
+
+
+def http_error(error_class, status):
+    return error_class(SimpleNamespace(status=status, reason=''), 'error')
+
+
+def test_due_reminders_are_sent_once(storage, session):
+    due = add_reminder(storage, session, NOW - timedelta(minutes=1))
+    later = add_reminder(storage, session, NOW + timedelta(minutes=30))
+    send = Recorder()
+    scheduler = ReminderScheduler(storage, send, horizon=timedelta(hours=1))
+
+    asyncio.run(scheduler.fire_due(NOW))
+    asyncio.run(scheduler.fire_due(NOW + timedelta(minutes=30)))
+    asyncio.run(scheduler.fire_due(NOW + timedelta(minutes=31)))
+
+    assert send.sent == [due.id, later.id]
+    assert status(storage, due).status == status(storage, later).status == 'Sent'
+
+
+def test_restart_does_not_send_twice(storage, session):
+    sent_before = add_reminder(storage, session, NOW - timedelta(minutes=5))
+    missed = add_reminder(storage, session, NOW - timedelta(minutes=1), kind='channel')
+    upcoming = add_reminder(storage, session, NOW + timedelta(minutes=10))
+
+    first = Recorder()
+    asyncio.run(ReminderScheduler(storage, first).fire(sent_before.id, NOW - timedelta(minutes=5)))
+    assert first.sent == [sent_before.id]
+
+    # The bot restarts: a fresh scheduler reloads the horizon from the table
+    second = Recorder()
+    restarted = ReminderScheduler(storage, second, horizon=timedelta(hours=1))
+    asyncio.run(restarted.fire_due(NOW))
+    asyncio.run(restarted.fire_due(NOW + timedelta(minutes=10)))
+
+    assert second.sent == [missed.id, upcoming.id]
+
+    # And again, with everything already sent
+    third = Recorder()
+    asyncio.run(ReminderScheduler(storage, third).fire_due(NOW + timedelta(minutes=11)))
+    assert third.sent == []
+
+
+def test_reminder_claimed_by_another_process_is_skipped(storage, session):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder()
+    first = ReminderScheduler(storage, send)
+    second = ReminderScheduler(storage, send)
+    asyncio.run(first.load_horizon(NOW))
+    asyncio.run(second.load_horizon(NOW))
+
+    asyncio.run(first.fire_due(NOW))
+    asyncio.run(second.fire_due(NOW))
+
+    assert send.sent == [reminder.id]
+
+
+def test_failed_send_is_retried(storage, session):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder(errors=[http_error(discord.HTTPException, 503)])
+
+    asyncio.run(ReminderScheduler(storage, send).fire_due(NOW))
+    retry = status(storage, reminder)
+    assert (retry.status, retry.attempts) == ('Pending', 1)
+    assert retry.fire_at > NOW
+
+    # The retry survives a restart too
+    asyncio.run(ReminderScheduler(storage, send).fire_due(retry.fire_at))
+
+    assert send.sent == [reminder.id]
+    assert status(storage, reminder).status == 'Sent'
+
+
+def test_failed_send_gives_up_after_max_attempts(storage, session):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder(errors=[RuntimeError("boom")] * 3)
+    scheduler = ReminderScheduler(storage, send, max_attempts=3)
+
+    now = NOW
+    for _ in range(3):
+        asyncio.run(scheduler.fire_due(now))
+        now = status(storage, reminder).fire_at
+
+    failed = status(storage, reminder)
+    assert (failed.status, failed.attempts) == ('Failed', 3)
+    assert send.sent == []
+
+
+def test_forbidden_send_is_not_retried(storage, session):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder(errors=[http_error(discord.Forbidden, 403)])
+
+    asyncio.run(ReminderScheduler(storage, send).fire_due(NOW))
+
+    assert status(storage, reminder).status == 'Failed'
+
+
+def test_reminder_for_started_session_is_skipped(storage, session):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder()
+
+    asyncio.run(ReminderScheduler(storage, send).fire_due(session.starts_at))
+
+    assert send.sent == []
+    assert status(storage, reminder).status == 'Skipped'
+
+
+def test_cancelled_reminder_is_not_sent(storage, session):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder()
+    scheduler = ReminderScheduler(storage, send)
+    asyncio.run(scheduler.load_horizon(NOW))
+
+    # Cancelled from another process, so this scheduler still has it queued
+    assert asyncio.run(storage.delete_session(reminder.session_id)) == [reminder.id]
+    asyncio.run(scheduler.fire_due(NOW))
+
+    assert send.sent == []
+
+
+def test_reminder_whose_plot_point_is_gone_is_skipped(storage, session, monkeypatch):
+    reminder = add_reminder(storage, session, NOW)
+    send = Recorder()
+
+    async def deleted(plot_id):
+        return None
+
+    # Deleted by another process between the claim and the lookup
+    monkeypatch.setattr(storage, 'get_plot_point', deleted)
+    asyncio.run(ReminderScheduler(storage, send).fire_due(NOW))
+
+    assert send.sent == []
+    assert status(storage, reminder).status == 'Skipped'